@@ -0,0 +1,92 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+from graph.deadline import httpx_deadline_hook
+from utils.circuit_breaker import guarded
+from utils.rate_limit import limited
+from utils.tracing import span, token_usage
+
+# ---------------------- Shared LLM Clients ----------------------
+
+_CHAT_CLIENTS: Dict[Tuple[str, float, Optional[float]], object] = {}
+_CLASSES: Dict[str, type] = {}
+_LOCK = threading.Lock()
+
+
+def _limited_chat_class():
+    """ChatOllama subclass that checks the 'ollama_chat' breaker and holds a limiter slot for every request"""
+    cls = _CLASSES.get("chat")
+    if cls is None:
+        from langchain_ollama import ChatOllama
+
+        class LimitedChatOllama(ChatOllama):
+            def _generate(self, messages, *args, **kwargs):
+                prompt_chars = sum(len(str(m.content)) for m in messages)
+                with span("llm.chat", "llm", model=self.model, prompt_chars=prompt_chars) as attrs:
+                    with guarded("ollama_chat"), limited(f"ollama_chat:{self.model}") as usage:
+                        with span("llm.http", "llm", model=self.model):
+                            result = super()._generate(messages, *args, **kwargs)
+                        attrs.update(token_usage(result))
+                        usage["units"] = attrs.get("output_tokens") or 1
+                    return result
+
+            def _stream(self, *args, **kwargs):
+                with guarded("ollama_chat"), limited(f"ollama_chat:{self.model}") as usage:
+                    for chunk in super()._stream(*args, **kwargs):
+                        usage["units"] = usage.get("units", 0) + 1
+                        yield chunk
+
+        cls = _CLASSES["chat"] = LimitedChatOllama
+    return cls
+
+
+def _limited_search_class():
+    """TavilySearch subclass that checks the 'tavily' breaker and takes a rate-limit token before every search"""
+    cls = _CLASSES.get("search")
+    if cls is None:
+        from langchain_tavily import TavilySearch
+
+        class LimitedTavilySearch(TavilySearch):
+            def _run(self, *args, **kwargs):
+                with span("search.tavily", "search", query_chars=len(str(args[0] if args else kwargs.get("query", "")))) as attrs:
+                    with guarded("tavily"), limited("tavily"):
+                        with span("search.http", "search"):
+                            result = super()._run(*args, **kwargs)
+                    attrs["result_chars"] = len(str(result))
+                    return result
+
+        cls = _CLASSES["search"] = LimitedTavilySearch
+    return cls
+
+
+def deadline_client_kwargs(timeout: Optional[float] = None) -> Dict[str, object]:
+    """httpx settings for Ollama clients: a static timeout, tightened per request to the current deadline"""
+    client_kwargs: Dict[str, object] = {"event_hooks": {"request": [httpx_deadline_hook]}}
+    if timeout:
+        client_kwargs["timeout"] = timeout
+    return client_kwargs
+
+
+def get_chat_llm(model_name: str, temperature: float, timeout: Optional[float] = None):
+    """Return one ChatOllama per (model, temperature, timeout) so HTTP connections are reused across calls.
+    timeout bounds each HTTP request to Ollama; within a stage the remaining deadline bounds it further."""
+    key = (model_name, float(temperature), timeout)
+    with _LOCK:
+        llm = _CHAT_CLIENTS.get(key)
+        if llm is None:
+            llm = _limited_chat_class()(model=model_name, temperature=temperature,
+                                        client_kwargs=deadline_client_kwargs(timeout))
+            _CHAT_CLIENTS[key] = llm
+        return llm
+
+
+def get_search_tool(max_results: int = 3, search_depth: str = "basic"):
+    """Tavily search tool sharing the process-wide search rate limit"""
+    with _LOCK:
+        cls = _limited_search_class()
+    return cls(
+        max_results=max_results,
+        include_answer=True,
+        include_raw_content=False,
+        search_depth=search_depth,
+    )
@@ -0,0 +1,98 @@
+"""
+Per-stage model routing with latency / quality statistics per route.
+
+MODEL_ROUTING_POLICY=static uses RESEARCH_MODEL / SUMMARY_MODEL / PITCH_MODEL
+(each defaulting to OLLAMA_MODEL). MODEL_ROUTING_POLICY=auto starts from those and:
+
+- sends short inputs (< ROUTING_LONG_INPUT_CHARS) to SMALL_MODEL,
+- escalates long research text to LARGE_MODEL,
+- runs research itself on SMALL_MODEL in quick mode.
+
+Routes depend only on the stage inputs, never on cache state: the routed model is part
+of the stage cache key, so a repeat topic must pick the same model to hit its cached output.
+
+Quality is a cheap proxy: the share of the prompt's expected sections found in the
+output, with fallbacks scored 0. Stats are in-process and exposed by route_stats().
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import get_config
+
+EXPECTED_SECTIONS: Dict[str, List[str]] = {
+    "summary": ["Market Summary", "Insights", "Competitors", "Next Steps"],
+    "pitch": ["Elevator Pitch", "Problem", "Solution", "Market", "Business Model", "Competitors",
+              "Go-to-Market", "Financial Ask"],
+}
+
+
+# ---------------------- Route Selection ----------------------
+
+def _stage_model(stage: str, config: Dict[str, Any]) -> str:
+    return config.get(f"{stage.upper()}_MODEL") or config.get("OLLAMA_MODEL", "gemma:2b")
+
+
+def choose_model(stage: str, input_chars: int = 0) -> Tuple[str, str]:
+    """Return (model name, reason) for a stage"""
+    config = get_config()
+    model = _stage_model(stage, config)
+    if config.get("MODEL_ROUTING_POLICY", "static") != "auto":
+        return model, "static"
+
+    small = config.get("SMALL_MODEL") or model
+    large = config.get("LARGE_MODEL") or model
+    long_input = config.get("ROUTING_LONG_INPUT_CHARS", 4000)
+
+    if stage == "research":
+        return (small, "quick mode") if config.get("USE_QUICK_MODE", False) else (model, "stage default")
+    if input_chars >= long_input:
+        return large, f"long input ({input_chars} chars)"
+    return small, f"short input ({input_chars} chars)"
+
+
+# ---------------------- Route Statistics ----------------------
+
+_STATS: Dict[Tuple[str, str], Dict[str, float]] = {}
+_LOCK = threading.Lock()
+
+
+def quality_score(stage: str, output: Optional[str], ok: bool = True) -> float:
+    if not ok or not output:
+        return 0.0
+    sections = EXPECTED_SECTIONS.get(stage)
+    if not sections:
+        return 1.0
+    lowered = output.lower()
+    return sum(1 for s in sections if s.lower() in lowered) / len(sections)
+
+
+def record_route(stage: str, model: str, latency: float, output: Optional[str] = None, ok: bool = True):
+    quality = quality_score(stage, output, ok)
+    with _LOCK:
+        stats = _STATS.setdefault((stage, model), {"calls": 0, "failures": 0, "total_latency": 0.0,
+                                                   "max_latency": 0.0, "total_quality": 0.0,
+                                                   "total_output_chars": 0})
+        stats["calls"] += 1
+        stats["failures"] += 0 if ok else 1
+        stats["total_latency"] += latency
+        stats["max_latency"] = max(stats["max_latency"], latency)
+        stats["total_quality"] += quality
+        stats["total_output_chars"] += len(output or "")
+
+
+def route_stats() -> Dict[str, Dict[str, Any]]:
+    with _LOCK:
+        snapshot = {key: dict(value) for key, value in _STATS.items()}
+    report = {}
+    for (stage, model), s in snapshot.items():
+        calls = s["calls"] or 1
+        report[f"{stage}:{model}"] = {
+            "calls": s["calls"],
+            "failure_rate": round(s["failures"] / calls, 3),
+            "avg_latency_s": round(s["total_latency"] / calls, 3),
+            "max_latency_s": round(s["max_latency"], 3),
+            "avg_quality": round(s["total_quality"] / calls, 3),
+            "avg_output_chars": int(s["total_output_chars"] / calls),
+        }
+    return report
@@ -1,8 +1,9 @@
 import os
+import time
 from dotenv import load_dotenv
-from langchain_ollama import ChatOllama
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from agents.llm_clients import get_chat_llm
+from agents.model_router import choose_model, record_route
+from config import get_config
 
 
 load_dotenv()
@@ -25,29 +26,47 @@ Summary: {summary}
 
 Keep each section concise and actionable."""
 
+PITCH_FALLBACK = "Startup Pitch Outline:\n\n**Problem**: Address market need\n**Solution**: Innovative approach\n**Market**: Target customer segment\n**Business Model**: Revenue streams\n**Competition**: Key differentiators\n**Go-to-Market**: Launch strategy\n**Funding**: Investment ask and use of funds"
+
+
+def get_pitch_settings(input_chars: int = 0) -> dict:
+    """Model settings the pitch generator runs with (also part of the stage cache key)"""
+    model, reason = choose_model("pitch", input_chars)
+    return {
+        "model": model,
+        "route": reason,
+        "temperature": float(os.getenv("PITCH_TEMPERATURE", "0")),
+        "timeout": get_config().get("PITCH_TIMEOUT"),
+    }
+
 
 # ---------------------- Pitch Generator Functions ----------------------
 
-def generate_pitch(research: str, summary: str) -> str:
-    model_name = os.getenv("OLLAMA_MODEL", "gemma:2b")
-    temp = float(os.getenv("PITCH_TEMPERATURE", "0"))
-    
-    llm = ChatOllama(model=model_name, temperature=temp)
+def generate_pitch(research: str, summary: str, settings: dict | None = None) -> str:
+    from langchain.prompts import PromptTemplate
+    from langchain.chains import LLMChain
+
+    settings = settings or get_pitch_settings(len(research) + len(summary))
+    llm = get_chat_llm(settings["model"], settings["temperature"], settings["timeout"])
     prompt = PromptTemplate.from_template(PITCH_PROMPT)
     chain = LLMChain(llm=llm, prompt=prompt)
 
+    start_time = time.time()
     try:
         out = chain.invoke({"research": research, "summary": summary})
         
         if isinstance(out, dict) and 'text' in out:
-            return out['text']
+            text = out['text']
         elif isinstance(out, dict) and 'content' in out:
-            return out['content']
+            text = out['content']
         elif isinstance(out, str):
-            return out
+            text = out
         else:
-            return str(out)
+            text = str(out)
+        record_route("pitch", settings["model"], time.time() - start_time, text)
+        return text
             
     except Exception as e:
         print(f"⚠️ Pitch generator LLM failed: {e}")
-        return f"Startup Pitch Outline:\n\n**Problem**: Address market need\n**Solution**: Innovative approach\n**Market**: Target customer segment\n**Business Model**: Revenue streams\n**Competition**: Key differentiators\n**Go-to-Market**: Launch strategy\n**Funding**: Investment ask and use of funds"
\ No newline at end of file
+        record_route("pitch", settings["model"], time.time() - start_time, ok=False)
+        return PITCH_FALLBACK
\ No newline at end of file
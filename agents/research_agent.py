@@ -1,10 +1,8 @@
 import os
 from dotenv import load_dotenv
-from langchain_ollama import ChatOllama
-from langchain.agents import initialize_agent, AgentType
-from langchain_tavily import TavilySearch
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from agents.llm_clients import get_chat_llm, get_search_tool
+from agents.model_router import choose_model
+from config import get_config
 
 
 load_dotenv()
@@ -12,24 +10,22 @@ load_dotenv()
 
 # ---------------------- Market Research Agent ----------------------
 
-def get_research_agent(max_results: int = 3, model: str | None = None, temp: float | None = None):
+def get_research_agent(max_results: int = 3, model: str | None = None, temp: float | None = None,
+                       max_execution_time: float | None = None):
     """Return an optimized research agent for faster market research.
     Notes:
     - Reduced max_results for faster processing
     - Uses structured prompts for more focused research
-    - Optimized for startup market analysis"""
-    
-    model_name = model or os.getenv("OLLAMA_MODEL", "gemma:2b")
+    - Optimized for startup market analysis
+    - max_execution_time stops the agent loop once the research budget is spent"""
+    from langchain.agents import initialize_agent, AgentType
+
+    model_name = model or choose_model("research")[0]
     temp = float(temp or os.getenv("OLLAMA_TEMPERATURE", "0.1"))
 
-    tavily_tool = TavilySearch(
-        max_results=max_results, 
-        include_answer=True, 
-        include_raw_content=False,  
-        search_depth="basic"  
-    )
+    tavily_tool = get_search_tool(max_results=max_results, search_depth="basic")
 
-    llm = ChatOllama(model=model_name, temperature=temp)
+    llm = get_chat_llm(model_name, temp, get_config().get("RESEARCH_TIMEOUT"))
 
 
 # ---------------------- Initialize Agent ----------------------
@@ -40,16 +36,17 @@ def get_research_agent(max_results: int = 3, model: str | None = None, temp: flo
         verbose=False,
         handle_parsing_errors=True,
         max_iterations=3,    
+        max_execution_time=max_execution_time,
         early_stopping_method="generate"  
     )
     return agent
 
 
 # ---------------------- Improve Research Performance ----------------------
-def quick_research(topic: str, max_results: int = 2) -> str:
+def quick_research(topic: str, max_results: int = 2, max_execution_time: float | None = None) -> str:
     """Fast research function for immediate results"""
     try:
-        agent = get_research_agent(max_results=max_results)
+        agent = get_research_agent(max_results=max_results, max_execution_time=max_execution_time)
         query = f"startup market analysis {topic} key insights competitors 2024"
         result = agent.run(query)
         
@@ -1,9 +1,15 @@
+from __future__ import annotations
+
 import os
+import time
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from langchain_ollama import ChatOllama
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from langchain.schema import Document
+from agents.llm_clients import get_chat_llm
+from agents.model_router import choose_model, record_route
+from config import get_config
+
+if TYPE_CHECKING:
+    from langchain.schema import Document
 
 
 load_dotenv()
@@ -21,10 +27,23 @@ Research: {documents}
 
 Focus on actionable insights only."""
 
+SUMMARY_FALLBACK = "Research analysis completed. Key focus areas identified for market entry and competitive positioning."
+
+
+def get_summary_settings(input_chars: int = 0) -> dict:
+    """Model settings the summarizer runs with (also part of the stage cache key)"""
+    model, reason = choose_model("summary", input_chars)
+    return {
+        "model": model,
+        "route": reason,
+        "temperature": float(os.getenv("SUM_TEMPERATURE", "0")),
+        "timeout": get_config().get("SUMMARY_TIMEOUT"),
+    }
+
 
 # ---------------------- Document Summarizer Function----------------------
 
-def summarize_documents(docs: list[Document] | list[str]) -> str:
+def summarize_documents(docs: list[Document] | list[str], settings: dict | None = None) -> str:
     if not docs:
         return "No documents provided to summarize."
 
@@ -33,25 +52,30 @@ def summarize_documents(docs: list[Document] | list[str]) -> str:
     else:
         texts = "\n\n---\n\n".join(docs)
 
-    model_name = os.getenv("OLLAMA_MODEL", "gemma:2b")
-    temp = float(os.getenv("SUM_TEMPERATURE", "0"))
+    from langchain.prompts import PromptTemplate
+    from langchain.chains import LLMChain
 
-    llm = ChatOllama(model=model_name, temperature=temp)
+    settings = settings or get_summary_settings(len(texts))
+    llm = get_chat_llm(settings["model"], settings["temperature"], settings["timeout"])
     prompt = PromptTemplate.from_template(SUMMARY_PROMPT)
     chain = LLMChain(llm=llm, prompt=prompt)
 
+    start_time = time.time()
     try:
         out = chain.invoke({"documents": texts})
         
         if isinstance(out, dict) and 'text' in out:
-            return out['text']
+            text = out['text']
         elif isinstance(out, dict) and 'content' in out:
-            return out['content']
+            text = out['content']
         elif isinstance(out, str):
-            return out
+            text = out
         else:
-            return str(out)
+            text = str(out)
+        record_route("summary", settings["model"], time.time() - start_time, text)
+        return text
             
     except Exception as e:
         print(f"⚠️ Summarizer LLM failed: {e}")
-        return f"Research analysis completed. Key focus areas identified for market entry and competitive positioning."
\ No newline at end of file
+        record_route("summary", settings["model"], time.time() - start_time, ok=False)
+        return SUMMARY_FALLBACK
\ No newline at end of file
@@ -1,15 +1,34 @@
 from vectorstore.chroma_vector import get_vectorstore
+from vectorstore.backends import retrieve
+from utils.circuit_breaker import circuit_protected
+from utils.tracing import span
 
 # ---------------------- Vector Store Management ----------------------
 
+@circuit_protected("vector_store")
 def store_documents(docs):
     """Store documents in ChromaDB vector store"""
-    vs = get_vectorstore()
-    vs.add_documents(docs)
+    with span("store.add", "store", documents=len(docs), chars=sum(len(d.page_content) for d in docs)):
+        vs = get_vectorstore()
+        vs.add_documents(docs)
     return f"Stored {len(docs)} documents in vector database"
 
-def search_documents(query, k=5):
-    """Search for relevant documents in the vector store"""
-    vs = get_vectorstore()
-    docs = vs.similarity_search(query, k=k)
-    return docs
\ No newline at end of file
+@circuit_protected("vector_store")
+def search_documents(query, k=5, filter=None, score_threshold=None, use_mmr=False, fetch_k=20, lambda_mult=0.5):
+    """Search for relevant documents in the vector store.
+    Notes:
+    - filter: metadata match applied inside the index, e.g. {"topic": topic, "source": "research"}
+    - score_threshold: minimum relevance score in [0, 1]
+    - use_mmr: rerank fetch_k candidates for diversity (lambda_mult 1.0 = pure relevance)"""
+    with span("store.search", "store", k=k, use_mmr=use_mmr, filtered=bool(filter)) as attrs:
+        docs = retrieve(
+            query,
+            k=k,
+            filter=filter,
+            score_threshold=score_threshold,
+            use_mmr=use_mmr,
+            fetch_k=fetch_k,
+            lambda_mult=lambda_mult,
+        )
+        attrs["results"] = len(docs)
+    return docs
@@ -0,0 +1,300 @@
+"""
+Headless HTTP API for the startup intelligence pipeline.
+
+    POST /jobs                {"topic": "...", "session_id": optional, "timeout": optional seconds,
+                               "speculative": optional bool (default ENABLE_SPECULATIVE)}
+                              -> 202 {"job_id": ...}
+    GET  /jobs/<id>           job status and, once done, the result
+    GET  /jobs/<id>/stream    server-sent events until the job finishes
+    GET  /sessions            saved chat sessions
+    GET  /sessions/<id>       one saved session
+    GET  /health              worker, queue, limiter, circuit breaker and model route stats
+
+Jobs are queued and executed by a pool of pipeline workers, independent of the Streamlit UI.
+Speculative jobs expose a "provisional" result from a similar past topic while they run.
+Run with: python api_server.py --port 8000 --workers 2
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from agents.model_router import route_stats
+from config import get_config
+from graph.orchestrator import build_graph
+from graph.speculative import find_similar_result, get_executor
+from utils.circuit_breaker import breaker_stats
+from utils.rate_limit import limiter_stats
+from vectorstore.chat_store import create_session, get_session, list_sessions, update_session
+
+TERMINAL_STATES = ("done", "failed")
+
+
+# ---------------------- JSON Helpers ----------------------
+
+def _json_default(obj):
+    if hasattr(obj, "page_content") and hasattr(obj, "metadata"):
+        return {"page_content": obj.page_content, "metadata": obj.metadata}
+    return str(obj)
+
+
+def _dumps(payload: Any) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+# ---------------------- Job Queue and Worker Pool ----------------------
+
+class JobManager:
+    def __init__(self, workers: int = 2, max_queue: int = 100, retention: int = 1000):
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=max_queue)
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._changed = threading.Condition()
+        self._retention = retention
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"pipeline-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, topic: str, session_id: Optional[str] = None, timeout: Optional[float] = None,
+               speculative: bool = False) -> Dict[str, Any]:
+        job = {
+            "id": str(uuid.uuid4()),
+            "topic": topic,
+            "session_id": session_id,
+            "timeout": timeout,
+            "speculative": speculative,
+            "status": "queued",
+            "provisional": None,
+            "result": None,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "version": 0,
+        }
+        with self._changed:
+            self._jobs[job["id"]] = job
+            self._evict()
+        try:
+            self._queue.put_nowait(job["id"])
+        except queue.Full:
+            with self._changed:
+                del self._jobs[job["id"]]
+            raise
+        if speculative:
+            get_executor().submit(self._attach_provisional, job["id"], topic)
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait_for_change(self, job_id: str, version: int, timeout: float) -> Optional[Dict[str, Any]]:
+        """Block until the job's version moves past ``version`` or timeout expires"""
+        with self._changed:
+            self._changed.wait_for(lambda: self._jobs.get(job_id, {}).get("version", version + 1) != version,
+                                   timeout=timeout)
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._changed:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"workers": len(self._workers), "queue_size": self._queue.qsize(), "jobs": counts}
+
+    def _attach_provisional(self, job_id: str, topic: str):
+        """Look up a similar past result right after submit so queued jobs get it immediately"""
+        provisional = find_similar_result(topic)
+        if not provisional:
+            return
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] in TERMINAL_STATES:
+                return
+            job["provisional"] = provisional
+            job["version"] += 1
+            self._changed.notify_all()
+
+    def _update(self, job_id: str, **fields):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            job["version"] += 1
+            self._changed.notify_all()
+
+    def _evict(self):
+        while len(self._jobs) > self._retention:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest["status"] not in TERMINAL_STATES:
+                break
+            del self._jobs[oldest_id]
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            job = self.get(job_id)
+            if job is None:
+                continue
+            self._update(job_id, status="running", started_at=time.time())
+            try:
+                result = build_graph(job["topic"]).invoke({}, timeout=job.get("timeout"))
+                session_id = job.get("session_id")
+                try:
+                    if session_id:
+                        update_session(session_id, job["topic"], result)
+                    else:
+                        session_id = create_session(title=job["topic"].strip()[:60] or "Untitled",
+                                                    user_prompt=job["topic"], result=result)
+                except Exception as e:
+                    print(f"⚠️ Failed to save session for job {job_id}: {e}")
+                self._update(job_id, status="done", result=result, session_id=session_id, finished_at=time.time())
+            except Exception as e:
+                print(f"⚠️ Job {job_id} failed: {e}")
+                self._update(job_id, status="failed", error=str(e), finished_at=time.time())
+            finally:
+                self._queue.task_done()
+
+
+# ---------------------- HTTP Handler ----------------------
+
+class PipelineRequestHandler(BaseHTTPRequestHandler):
+    jobs: JobManager = None
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status: int, payload: Any):
+        body = _dumps(payload)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length).decode("utf-8"))
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self._send_json(404, {"error": "not found"})
+        try:
+            body = self._read_json()
+        except ValueError:
+            return self._send_json(400, {"error": "invalid JSON body"})
+        if not isinstance(body, dict):
+            return self._send_json(400, {"error": "JSON body must be an object"})
+        topic = body.get("topic")
+        if not isinstance(topic, str) or not topic.strip():
+            return self._send_json(400, {"error": "'topic' is required and must be a string"})
+        topic = topic.strip()
+        session_id = body.get("session_id")
+        if session_id is not None and not isinstance(session_id, str):
+            return self._send_json(400, {"error": "'session_id' must be a string"})
+        speculative = body.get("speculative", get_config().get("ENABLE_SPECULATIVE", False))
+        if not isinstance(speculative, bool):
+            return self._send_json(400, {"error": "'speculative' must be true or false"})
+        timeout = body.get("timeout")
+        if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0):
+            return self._send_json(400, {"error": "'timeout' must be a positive number of seconds"})
+        try:
+            job = self.jobs.submit(topic, session_id=session_id, timeout=timeout,
+                                   speculative=speculative)
+        except queue.Full:
+            return self._send_json(503, {"error": "job queue is full, retry later"})
+        self._send_json(202, {"job_id": job["id"], "status": job["status"]})
+
+    def do_GET(self):
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+        if parts == ["health"]:
+            return self._send_json(200, {"status": "ok", **self.jobs.stats(), "limiters": limiter_stats(),
+                                         "circuits": breaker_stats(), "routes": route_stats()})
+        if parts and parts[0] == "sessions" and len(parts) <= 2:
+            return self._sessions(parts[1] if len(parts) == 2 else None)
+        if len(parts) >= 2 and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                return self._send_json(404, {"error": "job not found"})
+            if len(parts) == 3 and parts[2] == "stream":
+                return self._stream(job)
+            if len(parts) == 2:
+                return self._send_json(200, job)
+        self._send_json(404, {"error": "not found"})
+
+    def _sessions(self, session_id: Optional[str]):
+        try:
+            if session_id is None:
+                return self._send_json(200, list_sessions())
+            session = get_session(session_id)
+        except Exception as e:
+            # breaker open or Chroma unavailable: tell the client instead of dropping the connection
+            print(f"⚠️ Session store unavailable: {e}")
+            return self._send_json(503, {"error": "session store unavailable, retry later"})
+        return self._send_json(200, session) if session else self._send_json(404, {"error": "session not found"})
+
+    def _stream(self, job: Dict[str, Any]):
+        """Server-sent events: one 'status' event per job change, ends when the job finishes"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            sent_version = None
+            while True:
+                if job["version"] != sent_version:
+                    self.wfile.write(b"event: status\ndata: " + _dumps(job) + b"\n\n")
+                    sent_version = job["version"]
+                else:
+                    self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+                if job["status"] in TERMINAL_STATES:
+                    return
+                job = self.jobs.wait_for_change(job["id"], sent_version, timeout=15)
+                if job is None:
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+
+# ---------------------- Server Entry Point ----------------------
+
+def serve(host: str, port: int, workers: int, max_queue: int):
+    PipelineRequestHandler.jobs = JobManager(workers=workers, max_queue=max_queue)
+    server = ThreadingHTTPServer((host, port), PipelineRequestHandler)
+    server.daemon_threads = True
+    print(f"🚀 Pipeline API listening on http://{host}:{port} with {workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    config = get_config()
+    parser = argparse.ArgumentParser(description="Serve the startup intelligence pipeline over HTTP.")
+    parser.add_argument("--host", default=config.get("API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=config.get("API_PORT", 8000))
+    parser.add_argument("--workers", type=int, default=config.get("API_WORKERS", 2))
+    parser.add_argument("--max-queue", type=int, default=config.get("API_MAX_QUEUE", 100))
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.max_queue)
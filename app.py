@@ -81,11 +81,37 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# ---------------------- Cached resources and data ----------------------
+@st.cache_resource(show_spinner=False)
+def register_session_listener():
+    """Hook the session caches up to chat_store once per server process.
+    Clients are not warmed here: chat_store and get_chat_llm already share them per process,
+    and importing langchain before the first render would delay the page."""
+    from vectorstore.chat_store import on_sessions_changed
+
+    on_sessions_changed(invalidate_session_cache)
+    return True
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_list_sessions():
+    return list_sessions()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_get_session(session_id):
+    return get_session(session_id)
+
+def invalidate_session_cache():
+    """Called by chat_store after create_session / update_session"""
+    cached_list_sessions.clear()
+    cached_get_session.clear()
+
+
 # ---------------------- Main method to show all stuff ----------------------
 def main():
     
     cfg = get_config()
     tavily_key = cfg.get("TAVILY_API_KEY")
+    register_session_listener()
 
     if "selected_session_id" not in st.session_state:
         st.session_state["selected_session_id"] = None
@@ -95,7 +121,7 @@ def main():
 # ---------------------- Sidebar: chat history ----------------------
     with st.sidebar:
         st.subheader("@Startup Intelligence Agent/")
-        sessions = list_sessions()
+        sessions = cached_list_sessions()
         titles = [s.get("title", "Untitled") for s in sessions]
         ids = [s.get("id") for s in sessions]
         
@@ -135,7 +161,7 @@ def main():
     
     selected_session = None
     if st.session_state["selected_session_id"] and not st.session_state["new_chat_clicked"]:
-        selected_session = get_session(st.session_state["selected_session_id"])
+        selected_session = cached_get_session(st.session_state["selected_session_id"])
 
     form_key = f"startup_form_{st.session_state.get('selected_session_id', 'new')}"
     with st.form(form_key):
@@ -234,7 +260,25 @@ def main():
             status_text.text("📊 Analyzing data and generating insights...")
             progress_bar.progress(60)
 
-            result = graph.invoke({})
+            provisional, future = None, None
+            if cfg.get("ENABLE_SPECULATIVE", False):
+                provisional, future = graph.invoke_speculative({})
+            if provisional:
+                preview = st.empty()
+                with preview.container():
+                    st.info(f"⚡ Showing the pitch from a similar past analysis "
+                            f"(\"{provisional['provisional_topic']}\", similarity {provisional['provisional_similarity']:.2f}) "
+                            f"while fresh research runs...")
+                    st.markdown(f"""
+                    <div class="result-container">
+                    <h3>🎯 Provisional Pitch Outline</h3>
+                    <hr>
+                    {provisional.get('pitch', '')}
+                    </div>
+                    """, unsafe_allow_html=True)
+            result = future.result() if future else graph.invoke({})
+            if provisional:
+                preview.empty()
             
             status_text.text("✅ Intelligence report generated successfully!")
             progress_bar.progress(100)
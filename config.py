@@ -13,33 +13,91 @@ PERFORMANCE_CONFIG = {
     "MAX_RESEARCH_RESULTS": int(os.getenv("MAX_RESEARCH_RESULTS", "3")),
     "RESEARCH_TIMEOUT": int(os.getenv("RESEARCH_TIMEOUT", "30")),
     
+    # ---------------------- Deadline settings (seconds) ----------------------
+    "REQUEST_TIMEOUT": int(os.getenv("REQUEST_TIMEOUT", "120")),
+    "SUMMARY_TIMEOUT": int(os.getenv("SUMMARY_TIMEOUT", "45")),
+    "PITCH_TIMEOUT": int(os.getenv("PITCH_TIMEOUT", "60")),
+    "VECTOR_TIMEOUT": int(os.getenv("VECTOR_TIMEOUT", "15")),
+    
     # ---------------------- LLM settings ----------------------
     "OLLAMA_MODEL": os.getenv("OLLAMA_MODEL", "gemma:2b"),
     "OLLAMA_TEMPERATURE": float(os.getenv("OLLAMA_TEMPERATURE", "0.1")),
     "OLLAMA_EMBED_MODEL": os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text"),
     
+    # ---------------------- Model routing ----------------------
+    "MODEL_ROUTING_POLICY": os.getenv("MODEL_ROUTING_POLICY", "static").lower(),
+    "RESEARCH_MODEL": os.getenv("RESEARCH_MODEL"),
+    "SUMMARY_MODEL": os.getenv("SUMMARY_MODEL"),
+    "PITCH_MODEL": os.getenv("PITCH_MODEL"),
+    "SMALL_MODEL": os.getenv("SMALL_MODEL"),
+    "LARGE_MODEL": os.getenv("LARGE_MODEL"),
+    "ROUTING_LONG_INPUT_CHARS": int(os.getenv("ROUTING_LONG_INPUT_CHARS", "4000")),
+    
+    # ---------------------- Backend concurrency / rate limits ----------------------
+    "ENABLE_RATE_LIMITING": os.getenv("ENABLE_RATE_LIMITING", "true").lower() == "true",
+    "LIMITER_QUEUE_TIMEOUT": float(os.getenv("LIMITER_QUEUE_TIMEOUT", "0")) or None,
+    "OLLAMA_INITIAL_CONCURRENCY": int(os.getenv("OLLAMA_INITIAL_CONCURRENCY", "2")),
+    "OLLAMA_MIN_CONCURRENCY": int(os.getenv("OLLAMA_MIN_CONCURRENCY", "1")),
+    "OLLAMA_MAX_CONCURRENCY": int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4")),
+    "OLLAMA_EMBED_INITIAL_CONCURRENCY": int(os.getenv("OLLAMA_EMBED_INITIAL_CONCURRENCY", "2")),
+    "OLLAMA_EMBED_MIN_CONCURRENCY": int(os.getenv("OLLAMA_EMBED_MIN_CONCURRENCY", "1")),
+    "OLLAMA_EMBED_MAX_CONCURRENCY": int(os.getenv("OLLAMA_EMBED_MAX_CONCURRENCY", "4")),
+    "OLLAMA_LATENCY_TOLERANCE": float(os.getenv("OLLAMA_LATENCY_TOLERANCE", "2.0")),
+    "TAVILY_RATE_PER_SEC": float(os.getenv("TAVILY_RATE_PER_SEC", "1.0")),
+    "TAVILY_BURST": int(os.getenv("TAVILY_BURST", "3")),
+    
+    # ---------------------- Circuit breakers ----------------------
+    "ENABLE_CIRCUIT_BREAKERS": os.getenv("ENABLE_CIRCUIT_BREAKERS", "true").lower() == "true",
+    "CIRCUIT_FAILURE_THRESHOLD": int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3")),
+    "CIRCUIT_RECOVERY_TIMEOUT": float(os.getenv("CIRCUIT_RECOVERY_TIMEOUT", "30")),
+    
     # ---------------------- Caching settings ----------------------
     "ENABLE_CACHING": os.getenv("ENABLE_CACHING", "true").lower() == "true",
     "CACHE_SIZE_LIMIT": int(os.getenv("CACHE_SIZE_LIMIT", "100")),
+    "STAGE_CACHE_ENABLED": os.getenv("STAGE_CACHE_ENABLED", "true").lower() == "true",
+    "STAGE_CACHE_PATH": os.getenv("STAGE_CACHE_PATH", "./data/stage_cache.sqlite3"),
+    "EMBED_CACHE_ENABLED": os.getenv("EMBED_CACHE_ENABLED", "true").lower() == "true",
+    "EMBED_CACHE_MEMORY_ITEMS": int(os.getenv("EMBED_CACHE_MEMORY_ITEMS", "2048")),
     
     # ---------------------- Vector storage settings ----------------------
     "VECTOR_STORAGE_ENABLED": os.getenv("VECTOR_STORAGE_ENABLED", "true").lower() == "true",
-    "VECTOR_DIR": os.getenv("VECTOR_DIR", "./chroma_db"),
+    "VECTOR_DIR": os.getenv("VECTOR_DIR", "./data/chroma_db"),
+    "VECTOR_BACKEND": os.getenv("VECTOR_BACKEND", "chroma").lower(),
+    "VECTOR_COLLECTION": os.getenv("VECTOR_COLLECTION", "startup_vectors"),
+    "ANN_LIBRARY": os.getenv("ANN_LIBRARY", "auto").lower(),
     
     # ---------------------- API settings ----------------------
     "TAVILY_API_KEY": os.getenv("TAVILY_API_KEY"),
     "TAVILY_SEARCH_DEPTH": os.getenv("TAVILY_SEARCH_DEPTH", "basic"),
     
+    # ---------------------- HTTP API server settings ----------------------
+    "API_HOST": os.getenv("API_HOST", "127.0.0.1"),
+    "API_PORT": int(os.getenv("API_PORT", "8000")),
+    "API_WORKERS": int(os.getenv("API_WORKERS", "2")),
+    "API_MAX_QUEUE": int(os.getenv("API_MAX_QUEUE", "100")),
+    
     # ---------------------- Performance flags ----------------------
     "ENABLE_PARALLEL_PROCESSING": os.getenv("ENABLE_PARALLEL_PROCESSING", "true").lower() == "true",
     "SKIP_VECTOR_STORAGE": os.getenv("SKIP_VECTOR_STORAGE", "false").lower() == "true",
-    "USE_QUICK_MODE": os.getenv("USE_QUICK_MODE", "false").lower() == "true"
+    "USE_QUICK_MODE": os.getenv("USE_QUICK_MODE", "false").lower() == "true",
+    
+    # ---------------------- Profiling / tracing ----------------------
+    "ENABLE_PROFILING": os.getenv("ENABLE_PROFILING", "false").lower() == "true",
+    "PROFILE_CPU": os.getenv("PROFILE_CPU", "false").lower() == "true",
+    "PROFILE_DIR": os.getenv("PROFILE_DIR", "./data/profiles"),
+    
+    # ---------------------- Speculative results ----------------------
+    "ENABLE_SPECULATIVE": os.getenv("ENABLE_SPECULATIVE", "false").lower() == "true",
+    "SPECULATIVE_MIN_SIMILARITY": float(os.getenv("SPECULATIVE_MIN_SIMILARITY", "0.9")),
+    "SPECULATIVE_COLLECTION": os.getenv("SPECULATIVE_COLLECTION", "analysis_results"),
+    "SPECULATIVE_WORKERS": int(os.getenv("SPECULATIVE_WORKERS", "2")),
 }
 
 # Quick mode configuration for faster results
 QUICK_MODE_CONFIG = {
     "MAX_RESEARCH_RESULTS": 2,
     "RESEARCH_TIMEOUT": 15,
+    "REQUEST_TIMEOUT": 60,
     "SKIP_VECTOR_STORAGE": True,
     "ENABLE_CACHING": True
 }
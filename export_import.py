@@ -0,0 +1,218 @@
+"""
+Bulk export / import of chat sessions and vector collections.
+
+Each collection is written in fixed-size chunks so memory stays constant:
+
+    <dir>/manifest.json
+    <dir>/<collection>/records-00000.jsonl      {"id", "document", "metadata"} per line
+    <dir>/<collection>/embeddings-00000.npy     float32 matrix, same row order
+
+Embeddings are exported with the data, so importing never calls the embedding model.
+The manifest records OLLAMA_EMBED_MODEL and the dimension; import refuses vector
+collections made with a different model or dimension than the target store.
+Vector collections are imported into the currently configured VECTOR_BACKEND, which
+also makes this the way to migrate between chroma / ann / numpy backends.
+
+    python export_import.py export backups/2026-10-19
+    python export_import.py import backups/2026-10-19 --collections chat_sessions
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from config import get_config
+from vectorstore.backends import get_chroma_client, get_persist_directory, get_vectorstore
+
+SESSIONS_COLLECTION = "chat_sessions"
+Batch = Tuple[List[str], List[str], List[Dict[str, Any]], Any]  # (ids, documents, metadatas, float32 matrix)
+
+
+# ---------------------- Readers ----------------------
+
+def _chroma_collection_names() -> List[str]:
+    return [getattr(c, "name", c) for c in get_chroma_client().list_collections()]
+
+
+def _local_collection_names(backend: str) -> List[str]:
+    root = os.path.join(get_persist_directory(), backend)
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name)))
+
+
+def _iter_chroma(name: str, batch_size: int) -> Iterator[Batch]:
+    import numpy as np
+
+    col = get_chroma_client().get_collection(name)
+    offset = 0
+    while True:
+        res = col.get(include=["documents", "metadatas", "embeddings"], limit=batch_size, offset=offset)
+        ids = res.get("ids") or []
+        if not ids:
+            return
+        embeddings = res.get("embeddings")
+        vectors = np.asarray(embeddings if embeddings is not None else [], dtype=np.float32)
+        docs = res.get("documents") or [""] * len(ids)
+        metas = res.get("metadatas") or [None] * len(ids)
+        yield ids, [d or "" for d in docs], [m or {} for m in metas], vectors
+        offset += len(ids)
+
+
+def _iter_local(name: str, batch_size: int) -> Iterator[Batch]:
+    yield from get_vectorstore(collection_name=name).iter_batches(batch_size)
+
+
+def _sources() -> Dict[str, str]:
+    """collection name -> reader kind for everything stored under VECTOR_DIR"""
+    backend = get_config().get("VECTOR_BACKEND", "chroma")
+    sources = {name: "chroma" for name in _chroma_collection_names()}
+    if backend != "chroma":
+        sources.update({name: backend for name in _local_collection_names(backend)})
+    return sources
+
+
+# ---------------------- Export ----------------------
+
+def export_collections(out_dir: str, collections: Optional[List[str]] = None, batch_size: int = 500) -> Dict[str, Any]:
+    import numpy as np
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest: Dict[str, Any] = {"format": 1, "created_at": int(time.time()),
+                                "embed_model": get_config().get("OLLAMA_EMBED_MODEL", "nomic-embed-text"),
+                                "collections": {}}
+    sources = _sources()
+
+    for name in collections or sorted(sources):
+        source = sources.get(name)
+        if source is None:
+            print(f"⚠️ Collection '{name}' not found, skipping")
+            continue
+        col_dir = os.path.join(out_dir, name)
+        os.makedirs(col_dir, exist_ok=True)
+        reader = _iter_chroma if source == "chroma" else _iter_local
+        count, chunks, dim = 0, 0, None
+
+        for ids, docs, metas, vectors in reader(name, batch_size):
+            with open(os.path.join(col_dir, f"records-{chunks:05d}.jsonl"), "w", encoding="utf-8") as f:
+                for sid, doc, meta in zip(ids, docs, metas):
+                    f.write(json.dumps({"id": sid, "document": doc, "metadata": meta}, ensure_ascii=False) + "\n")
+            np.save(os.path.join(col_dir, f"embeddings-{chunks:05d}.npy"), vectors)
+            dim = dim or (int(vectors.shape[1]) if vectors.ndim == 2 and vectors.size else None)
+            count += len(ids)
+            chunks += 1
+
+        collection_meta = None
+        if source == "chroma":
+            collection_meta = get_chroma_client().get_collection(name).metadata
+        manifest["collections"][name] = {
+            "source_backend": source,
+            "kind": "sessions" if name == SESSIONS_COLLECTION else "vectors",
+            "count": count,
+            "chunks": chunks,
+            "dim": dim,
+            "collection_metadata": collection_meta,
+        }
+        print(f"📦 Exported {count} records from '{name}' in {chunks} chunks")
+
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+# ---------------------- Import ----------------------
+
+def _read_chunks(col_dir: str, chunks: int) -> Iterator[Batch]:
+    import numpy as np
+
+    for i in range(chunks):
+        ids, docs, metas = [], [], []
+        with open(os.path.join(col_dir, f"records-{i:05d}.jsonl"), encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                ids.append(record["id"])
+                docs.append(record.get("document") or "")
+                metas.append(record.get("metadata") or {})
+        yield ids, docs, metas, np.load(os.path.join(col_dir, f"embeddings-{i:05d}.npy"))
+
+
+def _existing_dim(name: str, target: str) -> Optional[int]:
+    if target != "chroma":
+        return get_vectorstore(collection_name=name).dimension
+    if name not in _chroma_collection_names():
+        return None
+    embeddings = get_chroma_client().get_collection(name).get(limit=1, include=["embeddings"]).get("embeddings")
+    return len(embeddings[0]) if embeddings is not None and len(embeddings) else None
+
+
+def _check_compatible(manifest: Dict[str, Any], selected: Dict[str, Dict[str, Any]], backend: str):
+    """Refuse the import before writing anything if the vectors would not be comparable"""
+    model = get_config().get("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+    exported_model = manifest.get("embed_model")
+    if any(info["kind"] == "vectors" for info in selected.values()) and exported_model != model:
+        raise ValueError(f"Export was embedded with '{exported_model}' but OLLAMA_EMBED_MODEL is '{model}'")
+    for name, info in selected.items():
+        target = "chroma" if info["kind"] == "sessions" else backend
+        dim = _existing_dim(name, target)
+        if dim is not None and info.get("dim") is not None and dim != info["dim"]:
+            raise ValueError(f"Collection '{name}' has dimension {dim}, export has {info['dim']}")
+
+
+def import_collections(in_dir: str, collections: Optional[List[str]] = None) -> Dict[str, int]:
+    with open(os.path.join(in_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    backend = get_config().get("VECTOR_BACKEND", "chroma")
+    selected = {name: info for name, info in manifest["collections"].items()
+                if not collections or name in collections}
+    _check_compatible(manifest, selected, backend)
+    imported: Dict[str, int] = {}
+
+    for name, info in selected.items():
+        target = "chroma" if info["kind"] == "sessions" else backend
+        count = 0
+        chunks = _read_chunks(os.path.join(in_dir, name), info["chunks"])
+        if target == "chroma":
+            col = get_chroma_client().get_or_create_collection(name=name, metadata=info.get("collection_metadata"))
+            for ids, docs, metas, vectors in chunks:
+                col.upsert(ids=ids, documents=docs, metadatas=[m or None for m in metas],
+                           embeddings=vectors.tolist() if vectors.size else None)
+                count += len(ids)
+        else:
+            store = get_vectorstore(collection_name=name)
+            with store.bulk_load():
+                for ids, docs, metas, vectors in chunks:
+                    store.add_embeddings(docs, vectors, metadatas=metas, ids=ids)
+                    count += len(ids)
+
+        imported[name] = count
+        print(f"📥 Imported {count} records into '{name}' ({target})")
+    return imported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or import chat sessions and vector collections.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", help="Write collections to a directory")
+    exp.add_argument("out_dir")
+    exp.add_argument("--collections", help="Comma-separated collection names (default: all)")
+    exp.add_argument("--batch-size", type=int, default=500)
+    imp = sub.add_parser("import", help="Load collections from an export directory")
+    imp.add_argument("in_dir")
+    imp.add_argument("--collections", help="Comma-separated collection names (default: all)")
+    args = parser.parse_args()
+
+    names = [c.strip() for c in args.collections.split(",") if c.strip()] if args.collections else None
+    if args.command == "export":
+        export_collections(args.out_dir, names, args.batch_size)
+    else:
+        try:
+            import_collections(args.in_dir, names)
+        except ValueError as e:
+            parser.exit(1, f"❌ Import refused: {e}\n")
@@ -0,0 +1,135 @@
+"""
+Per-request deadlines and per-stage timeouts for the orchestrator.
+
+A Deadline is created once per ``OptimizedGraph.invoke`` and handed to every stage.
+Each stage gets ``min(stage timeout, time left on the request)``; when that runs out
+the stage is abandoned and the caller falls back.
+
+The active deadline is also kept in a contextvar (copied into stage threads), so work
+left behind by an abandoned stage is cut off rather than left running: limited()
+refuses to queue or start calls once it has passed, and every Ollama HTTP request gets
+a timeout no longer than what is left of it (httpx_deadline_hook).
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+
+class StageTimeout(TimeoutError):
+    """Raised when a stage does not finish within its budget"""
+
+
+class DeadlineExceeded(StageTimeout):
+    """Raised inside a stage when it tries to start a backend call after its deadline"""
+
+
+class Deadline:
+    def __init__(self, timeout: Optional[float] = None):
+        self.started_at = time.monotonic()
+        self.expires_at = None if timeout is None else self.started_at + float(timeout)
+
+    def remaining(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def budget(self, stage_timeout: Optional[float] = None) -> Optional[float]:
+        """Seconds a stage may use: its own timeout capped by what is left of the request"""
+        remaining = self.remaining()
+        if stage_timeout is None:
+            return remaining
+        if remaining is None:
+            return float(stage_timeout)
+        return min(float(stage_timeout), remaining)
+
+    def check(self, what: str = "call"):
+        if self.expired():
+            raise DeadlineExceeded(f"{what} cancelled: deadline passed")
+
+
+# ---------------------- Current Deadline ----------------------
+
+_CURRENT_DEADLINE: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("current_deadline",
+                                                                                      default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _CURRENT_DEADLINE.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]):
+    """Make ``deadline`` the current one for the block (keeps the tighter of it and the outer one)"""
+    outer = current_deadline()
+    if outer is not None and outer.expires_at is not None and (
+            deadline is None or deadline.expires_at is None or outer.expires_at < deadline.expires_at):
+        deadline = outer
+    token = _CURRENT_DEADLINE.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _CURRENT_DEADLINE.reset(token)
+
+
+async def _hook_done():
+    return None
+
+
+def httpx_deadline_hook(request):
+    """httpx request hook: cap every timeout of the request at the time left on the current deadline.
+    Ollama builds a sync and an async client from the same kwargs, so when called from an
+    event loop the hook returns an awaitable as AsyncClient expects."""
+    deadline = current_deadline()
+    remaining = deadline.remaining() if deadline is not None else None
+    if remaining is not None:
+        if remaining <= 0:
+            raise DeadlineExceeded(f"{request.method} {request.url.path} cancelled: deadline passed")
+        timeouts = request.extensions.get("timeout") or {}
+        request.extensions["timeout"] = {
+            phase: remaining if timeouts.get(phase) is None else min(timeouts[phase], remaining)
+            for phase in ("connect", "read", "write", "pool")
+        }
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    return _hook_done()
+
+
+def run_with_timeout(fn: Callable[[], Any], timeout: Optional[float], name: str = "stage") -> Any:
+    """Run fn in a daemon thread and stop waiting after ``timeout`` seconds"""
+    if timeout is None:
+        return fn()
+    if timeout <= 0:
+        raise StageTimeout(f"{name} skipped: request deadline already passed")
+
+    outcome = {}
+    done = threading.Event()
+    context = contextvars.copy_context()
+
+    def _run():
+        with deadline_scope(Deadline(timeout)):
+            return fn()
+
+    def _target():
+        try:
+            outcome["result"] = context.run(_run)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            done.set()
+
+    threading.Thread(target=_target, name=f"{name}-call", daemon=True).start()
+    if not done.wait(timeout):
+        raise StageTimeout(f"{name} timed out after {timeout:.1f}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
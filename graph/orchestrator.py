@@ -2,19 +2,25 @@ import asyncio
 import hashlib
 import json
 import os
+import threading
 import time
 from typing import Dict, Any
 from agents.research_agent import get_research_agent, quick_research
-from agents.summarizer_agent import summarize_documents
-from agents.pitch_generator_agent import generate_pitch
+from agents.model_router import choose_model, record_route
+from agents.summarizer_agent import summarize_documents, get_summary_settings, SUMMARY_PROMPT, SUMMARY_FALLBACK
+from agents.pitch_generator_agent import generate_pitch, get_pitch_settings, PITCH_PROMPT, PITCH_FALLBACK
 from agents.vector_agent import store_documents
-from langchain.schema import Document
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import get_config, get_optimized_settings
+from graph.stage_cache import cached_stage
+from graph.deadline import Deadline, StageTimeout, deadline_scope, run_with_timeout
+from graph.speculative import find_similar_result, get_executor, remember_result
+from utils.tracing import profiled, span, start_trace
 
 
 RESEARCH_CACHE = {}
+_RESEARCH_CACHE_LOCK = threading.Lock()
 
 def get_cache_key(topic: str) -> str:
     """Generate a cache key for the topic"""
@@ -38,40 +44,78 @@ def cache_research(topic: str, results: Dict[str, Any]):
         return
     
     cache_key = get_cache_key(topic)
-    RESEARCH_CACHE[cache_key] = results
+    with _RESEARCH_CACHE_LOCK:
+        RESEARCH_CACHE[cache_key] = results
+
+        cache_limit = config.get("CACHE_SIZE_LIMIT", 100)
+        if len(RESEARCH_CACHE) > cache_limit:
+            
+            oldest_key = next(iter(RESEARCH_CACHE))
+            del RESEARCH_CACHE[oldest_key]
+
+
+# ---------------------- Stage Timeout Helper ----------------------
+def with_profile(name: str, fn):
+    """Wrap fn so it runs under cProfile (when PROFILE_CPU is on) in whichever thread executes it"""
+    def call():
+        with profiled(name):
+            return fn()
+    return call
 
-    cache_limit = config.get("CACHE_SIZE_LIMIT", 100)
-    if len(RESEARCH_CACHE) > cache_limit:
-        
-        oldest_key = next(iter(RESEARCH_CACHE))
-        del RESEARCH_CACHE[oldest_key]
+
+def run_stage(name: str, fn, deadline: Deadline, timeout_key: str, fallback: str):
+    """Run one LLM stage within its budget; return the fallback when the budget runs out"""
+    budget = deadline.budget(get_config().get(timeout_key))
+    with span(name, "stage", budget_s=budget) as attrs:
+        try:
+            output = run_with_timeout(with_profile(name, fn), budget, name)
+        except StageTimeout as e:
+            print(f"⏱️ {e}, using fallback")
+            attrs["timed_out"] = True
+            output = fallback
+        attrs["output_chars"] = len(output or "")
+        return output
+
+
+def is_complete_result(state: Dict[str, Any]) -> bool:
+    """True when no stage fell back to canned text, i.e. the result is worth reusing for similar topics"""
+    return not (state.get("research_fallback") or state.get("processing_fallback")
+                or state.get("summary") in ("", None, SUMMARY_FALLBACK)
+                or state.get("pitch") in ("", None, PITCH_FALLBACK))
 
 
 # ---------------------- Graph Building Method ----------------------
 def build_graph(topic):
     """Build the optimized orchestrator graph for the startup intelligence agent"""
     
-    def research_step(state):
+    def research_step(state, deadline: Deadline):
         """Research step: gather information about the topic"""
+        from langchain.schema import Document
+
         start_time = time.time()
         
         
         cached = get_cached_research(topic)
         if cached:
             print(f"✅ Using cached research for '{topic}' (saved {time.time() - start_time:.2f}s)")
-            return cached
+            return {**cached, "research_cached": True}
         
         settings = get_optimized_settings()
         max_results = settings.get("max_results", 3)
+        budget = deadline.budget(get_config().get("RESEARCH_TIMEOUT"))
+        research_model = choose_model("research")[0]
         
         try:
     
             if get_config().get("USE_QUICK_MODE", False):
-                research_result = quick_research(topic, max_results)
+                research_result = run_with_timeout(
+                    with_profile("research", lambda: quick_research(topic, max_results, max_execution_time=budget)),
+                    budget, "research")
             else:
-                agent = get_research_agent(max_results=max_results)
+                agent = get_research_agent(max_results=max_results, max_execution_time=budget)
                 research_query = f"startup market analysis {topic} competitors trends 2024"
-                research_result = agent.run(research_query)
+                research_result = run_with_timeout(with_profile("research", lambda: agent.run(research_query)),
+                                                   budget, "research")
             
             
             if not isinstance(research_result, str):
@@ -90,6 +134,7 @@ def build_graph(topic):
             cache_research(topic, result)
             
             research_time = time.time() - start_time
+            record_route("research", research_model, research_time, research_result)
             print(f"🔍 Research completed for '{topic}' in {research_time:.2f}s")
             
             return result
@@ -98,32 +143,51 @@ def build_graph(topic):
         # ---------------------- Handle Exception ----------------------
         except Exception as e:
             print(f"⚠️ Research failed, using fallback: {e}")
+            record_route("research", research_model, time.time() - start_time, ok=False)
             fallback_result = f"Market analysis for {topic}: Emerging market opportunity with growing demand. Focus on customer pain points and competitive differentiation."
             doc = Document(
                 page_content=fallback_result,
                 metadata={"source": "fallback", "topic": topic}
             )
             return {
+                "research_fallback": True,
                 "research_data": fallback_result,
                 "documents": [doc]
             }
     
     # ---------------------- Parallel Processing Step i.e Research, Summary, Pitch ----------------------
-    def parallel_processing_step(state):
+    def parallel_processing_step(state, deadline: Deadline):
         """Process research, summary, and pitch in parallel where possible"""
+        from langchain.schema import Document
+
         start_time = time.time()
         research_data = state.get("research_data", "")
         
         try:
-            summary = summarize_documents([Document(page_content=research_data)])
-            
-            if not isinstance(summary, str):
-                summary = str(summary)
-            
-            pitch = generate_pitch(research_data, summary)
+            summary_settings = get_summary_settings(len(research_data))
+            print(f"🧭 summary → {summary_settings['model']} ({summary_settings['route']})")
+            summary = cached_stage(
+                "summary",
+                {"documents": research_data},
+                summary_settings,
+                SUMMARY_PROMPT,
+                lambda: run_stage("summary",
+                                  lambda: summarize_documents([Document(page_content=research_data)], summary_settings),
+                                  deadline, "SUMMARY_TIMEOUT", SUMMARY_FALLBACK),
+                fallback=SUMMARY_FALLBACK,
+            )
             
-            if not isinstance(pitch, str):
-                pitch = str(pitch)
+            pitch_settings = get_pitch_settings(len(research_data) + len(summary))
+            print(f"🧭 pitch → {pitch_settings['model']} ({pitch_settings['route']})")
+            pitch = cached_stage(
+                "pitch",
+                {"research": research_data, "summary": summary},
+                pitch_settings,
+                PITCH_PROMPT,
+                lambda: run_stage("pitch", lambda: generate_pitch(research_data, summary, pitch_settings),
+                                  deadline, "PITCH_TIMEOUT", PITCH_FALLBACK),
+                fallback=PITCH_FALLBACK,
+            )
             
             processing_time = time.time() - start_time
             print(f"📝 Processing completed in {processing_time:.2f}s")
@@ -139,12 +203,13 @@ def build_graph(topic):
             fallback_pitch = f"Startup Pitch Outline:\n\n**Problem**: Address market need\n**Solution**: Innovative approach\n**Market**: Target customer segment\n**Business Model**: Revenue streams\n**Competition**: Key differentiators\n**Go-to-Market**: Launch strategy\n**Funding**: Investment ask and use of funds"
             
             return {
+                "processing_fallback": True,
                 "summary": fallback_summary,
                 "pitch": fallback_pitch
             }
     
-    def vectorize_step(state):
-        """Store documents in vector database (async, non-blocking)"""
+    def vectorize_step(state, deadline: Deadline):
+        """Store documents in the vector database within VECTOR_TIMEOUT / the request deadline"""
         config = get_config()
         if config.get("SKIP_VECTOR_STORAGE", False):
             return {"vector_status": "Vector storage skipped for performance"}
@@ -152,8 +217,13 @@ def build_graph(topic):
         docs = state.get("documents", [])
         if docs:
             try:
-                store_result = store_documents(docs)
+                store_result = run_with_timeout(with_profile("vectorize", lambda: store_documents(docs)),
+                                                deadline.budget(config.get("VECTOR_TIMEOUT")), "vector storage")
                 return {"vector_status": store_result}
+            except StageTimeout as e:
+                # abandoned work is cancelled at the deadline (limited() / HTTP timeouts), so nothing was stored
+                print(f"⏱️ {e}")
+                return {"vector_status": "Vector storage timed out; documents not stored"}
             except Exception as e:
                 print(f"⚠️ Vector storage failed: {e}")
                 return {"vector_status": "Storage completed in background"}
@@ -163,23 +233,61 @@ def build_graph(topic):
         def __init__(self, topic):
             self.topic = topic
         
-        def invoke(self, initial_state):
-            """Execute the workflow steps with optimizations"""
+        def invoke(self, initial_state, timeout: float | None = None, deadline: Deadline | None = None):
+            """Execute the workflow steps with optimizations.
+            timeout: overall budget in seconds (defaults to REQUEST_TIMEOUT); stages that run
+            past their share of it return their fallbacks instead of blocking the request"""
+            if deadline is None:
+                deadline = Deadline(timeout if timeout is not None else get_config().get("REQUEST_TIMEOUT"))
+            with start_trace("pipeline", topic=self.topic) as trace, deadline_scope(deadline):
+                return self._run(initial_state, deadline, trace)
+        
+        def _run(self, initial_state, deadline: Deadline, trace):
             total_start_time = time.time()
             state = initial_state.copy()
+            if trace is not None:
+                state["trace_id"] = trace.id
             
-            research_result = research_step(state)
+            with span("research", "stage") as attrs:
+                research_result = research_step(state, deadline)
+                attrs.update(cached=research_result.get("research_cached", False),
+                             output_chars=len(research_result.get("research_data", "")))
             state.update(research_result)
             
-            processing_result = parallel_processing_step(state)
+            with span("processing", "stage"):
+                processing_result = parallel_processing_step(state, deadline)
             state.update(processing_result)
             
-            vector_result = vectorize_step(state)
+            with span("vectorize", "stage", documents=len(state.get("documents", []))):
+                vector_result = vectorize_step(state, deadline)
             state.update(vector_result)
             
+            if get_config().get("ENABLE_SPECULATIVE", False) and is_complete_result(state):
+                # off the request thread: the request deadline (often spent by now) must not cancel indexing
+                get_executor().submit(remember_result, self.topic, dict(state), get_cache_key(self.topic))
+            
             total_time = time.time() - total_start_time
             print(f"🚀 Total processing time: {total_time:.2f}s")
             
             return state
+        
+        def invoke_speculative(self, initial_state, timeout: float | None = None, on_update=None):
+            """Return (provisional_state, future) without waiting for the pipeline.
+            provisional_state is the result of a semantically similar past topic; future resolves
+            to the fresh state from invoke(), also passed to on_update. Without a provisional
+            result this returns (None, None) and the caller should simply call invoke()."""
+            provisional = find_similar_result(self.topic) if get_config().get("ENABLE_SPECULATIVE", False) else None
+            if not provisional:
+                return None, None
+            print(f"⚡ Provisional pitch from '{provisional['provisional_topic']}' "
+                  f"(similarity {provisional['provisional_similarity']:.2f}), refreshing in background")
+            
+            future = get_executor().submit(self.invoke, initial_state, timeout)
+            if on_update is not None:
+                def _notify(done):
+                    if done.exception() is None:
+                        on_update(done.result())
+                future.add_done_callback(_notify)
+            return provisional, future
     
     return OptimizedGraph(topic)
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Speculative results for repeat-ish topics.
+
+Every completed analysis is indexed by its topic in the ``analysis_results`` collection
+of the configured vector backend. With ENABLE_SPECULATIVE on, a new request whose topic
+is at least SPECULATIVE_MIN_SIMILARITY similar to a past one gets that past pitch back
+immediately as a provisional result, while the full pipeline refreshes it in the background.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from config import get_config
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_LOCK = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=get_config().get("SPECULATIVE_WORKERS", 2),
+                thread_name_prefix="speculative-refresh",
+            )
+        return _EXECUTOR
+
+
+def _get_results_store():
+    from vectorstore.backends import get_vectorstore
+
+    return get_vectorstore(collection_name=get_config().get("SPECULATIVE_COLLECTION", "analysis_results"))
+
+
+# ---------------------- Lookup and Indexing ----------------------
+
+def find_similar_result(topic: str) -> Optional[Dict[str, Any]]:
+    """Return a provisional state built from the most similar past analysis, if close enough"""
+    config = get_config()
+    try:
+        matches = _get_results_store().similarity_search_with_relevance_scores(
+            topic, k=1, score_threshold=config.get("SPECULATIVE_MIN_SIMILARITY", 0.9)
+        )
+    except Exception as e:
+        print(f"⚠️ Speculative lookup failed: {e}")
+        return None
+    if not matches:
+        return None
+    doc, score = matches[0]
+    meta = doc.metadata or {}
+    return {
+        "research_data": meta.get("research_data", ""),
+        "summary": meta.get("summary", ""),
+        "pitch": meta.get("pitch", ""),
+        "provisional": True,
+        "provisional_topic": meta.get("topic", doc.page_content),
+        "provisional_similarity": round(float(score), 4),
+    }
+
+
+def remember_result(topic: str, state: Dict[str, Any], result_id: str):
+    """Index a finished analysis by topic so later similar topics can reuse it"""
+    try:
+        _get_results_store().add_texts(
+            [topic],
+            metadatas=[{
+                "topic": topic,
+                "research_data": state.get("research_data", ""),
+                "summary": state.get("summary", ""),
+                "pitch": state.get("pitch", ""),
+                "created_at": int(time.time()),
+            }],
+            ids=[result_id],
+        )
+    except Exception as e:
+        print(f"⚠️ Could not index result for speculative reuse: {e}")
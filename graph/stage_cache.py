@@ -0,0 +1,108 @@
+"""
+Persistent, content-addressed cache for summary and pitch outputs.
+
+Key = sha256(stage, inputs, model, temperature, prompt version), where the prompt
+version is a hash of the prompt template, so editing SUMMARY_PROMPT or PITCH_PROMPT
+invalidates old entries automatically (and they are purged on first use).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from config import get_config
+from utils.tracing import span
+
+
+_LOCK = threading.Lock()
+_CONNECTIONS: Dict[str, sqlite3.Connection] = {}
+_PURGED: set = set()
+
+
+def prompt_version(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def stage_cache_key(stage: str, inputs: Dict[str, Any], model: str, temperature: float, version: str) -> str:
+    payload = json.dumps(
+        {"stage": stage, "inputs": inputs, "model": model, "temperature": float(temperature), "prompt": version},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ---------------------- SQLite Storage ----------------------
+
+def _get_connection() -> sqlite3.Connection:
+    path = get_config().get("STAGE_CACHE_PATH", "./data/stage_cache.sqlite3")
+    conn = _CONNECTIONS.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS stage_cache (
+                key TEXT PRIMARY KEY,
+                stage TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                model TEXT NOT NULL,
+                temperature REAL NOT NULL,
+                output TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        conn.commit()
+        _CONNECTIONS[path] = conn
+    return conn
+
+
+def _purge_stale(conn: sqlite3.Connection, stage: str, version: str):
+    if (stage, version) in _PURGED:
+        return
+    removed = conn.execute(
+        "DELETE FROM stage_cache WHERE stage = ? AND prompt_version != ?", (stage, version)
+    ).rowcount
+    conn.commit()
+    _PURGED.add((stage, version))
+    if removed:
+        print(f"🧹 Dropped {removed} cached '{stage}' outputs from an older prompt version")
+
+
+# ---------------------- Cached Stage Execution ----------------------
+
+def cached_stage(stage: str, inputs: Dict[str, Any], settings: Dict[str, Any], prompt: str,
+                 compute: Callable[[], str], fallback: Optional[str] = None) -> str:
+    """Return the cached output for these inputs/settings/prompt, or compute and store it.
+    Fallback outputs are never cached."""
+    config = get_config()
+    if not (config.get("ENABLE_CACHING", True) and config.get("STAGE_CACHE_ENABLED", True)):
+        output = compute()
+        return output if isinstance(output, str) else str(output)
+
+    version = prompt_version(prompt)
+    key = stage_cache_key(stage, inputs, settings["model"], settings["temperature"], version)
+    with span(f"stage_cache.{stage}", "cache") as attrs, _LOCK:
+        conn = _get_connection()
+        _purge_stale(conn, stage, version)
+        row = conn.execute("SELECT output FROM stage_cache WHERE key = ?", (key,)).fetchone()
+        attrs["hit"] = row is not None
+    if row is not None:
+        print(f"✅ Using cached {stage}")
+        return row[0]
+
+    output = compute()
+    if not isinstance(output, str):
+        output = str(output)
+    if output and output != fallback:
+        with _LOCK:
+            conn = _get_connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO stage_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, stage, version, settings["model"], float(settings["temperature"]), output, time.time()),
+            )
+            conn.commit()
+    return output
@@ -1,16 +1,64 @@
+import argparse
+import json
+import sys
+
 from dotenv import load_dotenv
 load_dotenv()
 
-from vectorstore.singlestore_vector import get_vectorstore
+from vectorstore.backends import bulk_similarity_search
 
 def search_similar_queries(query: str):
-    vectorstore = get_vectorstore()
-    results = vectorstore.similarity_search(query, k=3)
+    results = search_similar_queries_bulk([query], k=3)[0]
 
     print(f"\n🔍 Top 3 matches for: '{query}'\n")
-    for i, doc in enumerate(results, 1):
-        print(f"{i}. {doc.page_content[:250]}...\n")
+    for i, (doc, score) in enumerate(results, 1):
+        print(f"{i}. ({score:.3f}) {doc.page_content[:250]}...\n")
+
+# ---------------------- Bulk Search ----------------------
+
+def search_similar_queries_bulk(queries: list[str], k: int = 3):
+    """Embed all queries in one batch and return top-k (Document, score) lists, one per query
+    (an empty list for blank queries, so results stay aligned with the input)"""
+    positions = [i for i, q in enumerate(queries) if q and q.strip()]
+    matches = bulk_similarity_search([queries[i].strip() for i in positions], k=k)
+    results = [[] for _ in queries]
+    for i, found in zip(positions, matches):
+        results[i] = found
+    return results
+
+def _read_queries(path: str) -> list[str]:
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        return [line.strip() for line in stream if line.strip()]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find past analyses similar to one or many startup ideas.")
+    parser.add_argument("--file", "-f", help="File with one query per line ('-' for stdin)")
+    parser.add_argument("-k", type=int, default=3, help="Matches per query")
+    parser.add_argument("--min-score", type=float, default=None,
+                        help="Only report matches at or above this relevance score (0-1), e.g. for deduplication")
+    args = parser.parse_args(argv)
+
+    if not args.file:
+        user_query = input("Enter a topic to search similar past analyses: ")
+        search_similar_queries(user_query)
+        return
+
+    queries = _read_queries(args.file)
+    results = search_similar_queries_bulk(queries, k=args.k)
+    for query, matches in zip(queries, results):
+        if args.min_score is not None:
+            matches = [(doc, score) for doc, score in matches if score >= args.min_score]
+        print(json.dumps({
+            "query": query,
+            "matches": [
+                {"score": round(score, 4), "id": doc.id, "metadata": doc.metadata, "preview": doc.page_content[:250]}
+                for doc, score in matches
+            ],
+        }, ensure_ascii=False))
 
 if __name__ == "__main__":
-    user_query = input("Enter a topic to search similar past analyses: ")
-    search_similar_queries(user_query)
\ No newline at end of file
+    main()
@@ -0,0 +1,78 @@
+"""CircuitBreaker state transitions: open, half-open probe, and failures that are not the backend's."""
+
+import pytest
+
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.rate_limit import LimiterTimeout
+
+
+def _fail(breaker, error=OSError("backend down")):
+    with pytest.raises(type(error)):
+        with breaker.guard():
+            raise error
+
+
+def test_opens_after_threshold_and_short_circuits():
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+    _fail(breaker)
+    assert breaker.state == CircuitBreaker.CLOSED
+    _fail(breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        with breaker.guard():
+            pass
+    assert breaker.stats()["short_circuited"] == 1
+
+
+def test_half_open_probe_success_closes():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0)
+    _fail(breaker)
+    with breaker.guard():
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        # only one probe at a time
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_probe_failure_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=0)
+    for _ in range(3):
+        _fail(breaker)
+    assert breaker.trips == 1
+    _fail(breaker)  # the probe
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.trips == 2
+
+
+def test_local_failures_do_not_count():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+    _fail(breaker, LimiterTimeout("queue full"))
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.consecutive_failures == 0
+
+
+def test_local_failure_during_probe_frees_the_slot():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0)
+    _fail(breaker)
+    _fail(breaker, LimiterTimeout("queue full"))
+    with breaker.guard():
+        pass
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_closed_generator_during_probe_frees_the_slot():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0)
+    _fail(breaker)
+
+    def stream():
+        with breaker.guard():
+            yield "chunk"
+            yield "chunk"
+
+    chunks = stream()
+    next(chunks)
+    chunks.close()  # GeneratorExit inside the probe
+    with breaker.guard():
+        pass
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,49 @@
+"""EmbeddingCache disk layout: torn-append recovery and rows shared between instances."""
+
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from vectorstore.embedding_cache import EmbeddingCache
+
+
+def test_torn_vector_append_is_truncated(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many(["a", "b"], [[1, 1], [2, 2]])
+    # simulate a crash after the vector append but before the key append
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(np.array([[9, 9]], dtype=np.float32).tobytes())
+
+    EmbeddingCache(str(tmp_path)).put_many(["c"], [[5, 5]])
+
+    reloaded = EmbeddingCache(str(tmp_path))
+    assert reloaded.get("c").tolist() == [5, 5]
+    assert reloaded.get("a").tolist() == [1, 1]
+    assert os.path.getsize(tmp_path / "vectors.f32") == 3 * 2 * 4
+
+
+def test_torn_key_line_is_dropped(tmp_path):
+    EmbeddingCache(str(tmp_path)).put_many(["a"], [[1, 1]])
+    with open(tmp_path / "keys.txt", "ab") as f:
+        f.write(b"partial")
+
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many(["b"], [[2, 2]])
+
+    reloaded = EmbeddingCache(str(tmp_path))
+    assert reloaded.get("b").tolist() == [2, 2]
+    assert reloaded.get("partial") is None
+
+
+def test_instances_share_rows(tmp_path):
+    first, second = EmbeddingCache(str(tmp_path)), EmbeddingCache(str(tmp_path))
+    first.put_many(["a"], [[1, 1]])
+    second.put_many(["b"], [[2, 2]])
+
+    # each sees the other's row without writing first
+    assert first.get("b").tolist() == [2, 2]
+    assert EmbeddingCache(str(tmp_path)).get("a").tolist() == [1, 1]
+    assert second.get("a").tolist() == [1, 1]
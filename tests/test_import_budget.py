@@ -0,0 +1,41 @@
+"""
+Import-time budget: entry points must not pull in langchain, chromadb or numpy
+until a request actually needs them (see the lazy imports in agents/ and vectorstore/).
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_S = float(os.getenv("IMPORT_BUDGET_S", "1.5"))
+HEAVY = ("langchain", "langchain_core", "langchain_community", "langchain_ollama", "langchain_tavily",
+         "chromadb", "numpy")
+MODULES = [
+    "graph.orchestrator",   # pipeline used by app.py and api_server.py
+    "vectorstore.chat_store",
+    "api_server",
+    "similar_queries",
+    "export_import",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "modules": sorted({{m.split(".")[0] for m in sys.modules}})}}))
+"""
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_import_stays_light(module):
+    out = subprocess.run([sys.executable, "-c", PROBE.format(module=module)], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    report = json.loads(out.stdout.strip().splitlines()[-1])
+    loaded = sorted(set(report["modules"]) & set(HEAVY))
+    assert not loaded, f"{module} imports {loaded} at import time"
+    assert report["elapsed"] < BUDGET_S, f"{module} took {report['elapsed']:.2f}s to import (budget {BUDGET_S}s)"
@@ -0,0 +1,166 @@
+"""
+Per-backend circuit breakers.
+
+After CIRCUIT_FAILURE_THRESHOLD consecutive failures a breaker opens and every call
+fails immediately with CircuitOpenError, which the agents already turn into their
+fallbacks. After CIRCUIT_RECOVERY_TIMEOUT seconds one probe call is let through
+(half-open): success closes the breaker, failure opens it again.
+
+Local failures are not held against the backend: a LimiterTimeout from our own
+queue, or any error once the caller's deadline has passed, neither counts as a
+failure nor closes the breaker.
+
+Breakers: 'ollama_chat', 'ollama_embed', 'tavily', 'chroma' (chat sessions), 'vector_store'.
+"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from config import get_config
+from graph.deadline import StageTimeout, current_deadline
+from utils.rate_limit import LimiterTimeout
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a backend whose breaker is open"""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 3, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.short_circuited = 0
+        self.trips = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self.short_circuited += 1
+            retry_in = max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(f"{self.name} circuit open after {self.consecutive_failures} failures; "
+                                   f"next probe in {retry_in:.0f}s")
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"✅ {self.name} recovered, closing circuit")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                    print(f"🔌 {self.name} circuit opened after {self.consecutive_failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def record_ignored(self):
+        """The call ended for a local reason; free the probe slot without judging the backend"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    @contextmanager
+    def guard(self):
+        self.before_call()
+        try:
+            yield
+        except Exception as e:
+            if _is_local_failure(e):
+                self.record_ignored()
+            else:
+                self.record_failure()
+            raise
+        except BaseException:
+            # GeneratorExit (stream closed early), KeyboardInterrupt: never leave the probe slot taken
+            self.record_ignored()
+            raise
+        self.record_success()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "trips": self.trips,
+                "short_circuited": self.short_circuited,
+            }
+
+
+def _is_local_failure(error: Exception) -> bool:
+    if isinstance(error, (LimiterTimeout, StageTimeout)):
+        return True
+    deadline = current_deadline()
+    return deadline is not None and deadline.expired()
+
+
+# ---------------------- Breaker Registry ----------------------
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_LOCK = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    with _LOCK:
+        breaker = _BREAKERS.get(name)
+        if breaker is None:
+            config = get_config()
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=config.get("CIRCUIT_FAILURE_THRESHOLD", 3),
+                recovery_timeout=config.get("CIRCUIT_RECOVERY_TIMEOUT", 30),
+            )
+            _BREAKERS[name] = breaker
+        return breaker
+
+
+@contextmanager
+def guarded(name: str):
+    """Run the block behind the named breaker (no-op when breakers are disabled)"""
+    if not get_config().get("ENABLE_CIRCUIT_BREAKERS", True):
+        yield
+        return
+    with get_breaker(name).guard():
+        yield
+
+
+def circuit_protected(name: str):
+    """Decorator form of guarded()"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with guarded(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    with _LOCK:
+        breakers = dict(_BREAKERS)
+    return {name: breaker.stats() for name, breaker in breakers.items()}
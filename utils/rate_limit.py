@@ -0,0 +1,242 @@
+"""
+Shared limiters for the backends every session competes for.
+
+- TokenBucket: fixed request rate with bursts (Tavily search).
+- AdaptiveConcurrencyLimiter: AIMD concurrency limit driven by observed latency
+  (Ollama chat and embeddings). The limit grows while latency stays near the best
+  latency seen and shrinks when it climbs or calls fail, so a single Ollama instance
+  is kept busy without being thrashed. Callers report the work done by each call
+  (output tokens, texts embedded) and latency is compared per unit of work, so short
+  agent steps and long pitch generations share one baseline.
+
+Limiters are process-wide and looked up by name with get_limiter(). Chat limiters are
+keyed per model ('ollama_chat:<model>') since models differ in speed per token.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from config import get_config
+from graph.deadline import DeadlineExceeded, current_deadline
+
+
+class LimiterTimeout(TimeoutError):
+    """Raised when a caller waited longer than its queue timeout for a slot"""
+
+
+class _QueueMetrics:
+    def __init__(self):
+        self.waiting = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, waited: float):
+        self.acquired += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "avg_wait_s": round(self.total_wait / self.acquired, 4) if self.acquired else 0.0,
+            "max_wait_s": round(self.max_wait, 4),
+        }
+
+
+# ---------------------- Token Bucket ----------------------
+
+class TokenBucket:
+    def __init__(self, name: str, rate: float, capacity: float):
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self.metrics = _QueueMetrics()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: Optional[float] = None):
+        start = time.monotonic()
+        with self._cond:
+            self.metrics.waiting += 1
+            try:
+                while True:
+                    self._refill()
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self.metrics.record_wait(time.monotonic() - start)
+                        return
+                    wait = (1 - self._tokens) / self.rate if self.rate > 0 else 1.0
+                    if timeout is not None:
+                        left = timeout - (time.monotonic() - start)
+                        if left <= 0:
+                            self.metrics.rejected += 1
+                            raise LimiterTimeout(f"{self.name}: no token within {timeout:.1f}s")
+                        wait = min(wait, left)
+                    self._cond.wait(wait)
+            finally:
+                self.metrics.waiting -= 1
+
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None):
+        self.acquire(timeout)
+        yield {}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            self._refill()
+            return {"type": "token_bucket", "rate_per_s": self.rate, "tokens": round(self._tokens, 2),
+                    **self.metrics.as_dict()}
+
+
+# ---------------------- Adaptive Concurrency Limit ----------------------
+
+class AdaptiveConcurrencyLimiter:
+    def __init__(self, name: str, initial: int = 2, min_limit: int = 1, max_limit: int = 8,
+                 latency_tolerance: float = 2.0, backoff: float = 0.75):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.in_flight = 0
+        self.best_latency: Optional[float] = None
+        self.last_latency: Optional[float] = None
+        self._cond = threading.Condition()
+        self.metrics = _QueueMetrics()
+
+    def acquire(self, timeout: Optional[float] = None):
+        start = time.monotonic()
+        with self._cond:
+            self.metrics.waiting += 1
+            try:
+                while self.in_flight >= int(self.limit):
+                    left = None if timeout is None else timeout - (time.monotonic() - start)
+                    if left is not None and left <= 0:
+                        self.metrics.rejected += 1
+                        raise LimiterTimeout(f"{self.name}: no slot within {timeout:.1f}s "
+                                             f"(limit {int(self.limit)}, in flight {self.in_flight})")
+                    self._cond.wait(left)
+                self.in_flight += 1
+                self.metrics.record_wait(time.monotonic() - start)
+            finally:
+                self.metrics.waiting -= 1
+
+    def release(self, latency: float, ok: bool = True, units: float = 1.0):
+        """latency is normalised by units (work done by the call) before it is compared"""
+        latency = latency / max(1.0, units)
+        with self._cond:
+            self.in_flight -= 1
+            self.last_latency = latency
+            if ok:
+                # best latency drifts up slowly so one lucky fast call does not pin it forever
+                if self.best_latency is None or latency < self.best_latency:
+                    self.best_latency = latency
+                else:
+                    self.best_latency *= 1.01
+            if not ok or latency > self.best_latency * self.latency_tolerance:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None):
+        """Yields a dict; set "units" in it to report how much work the call did"""
+        self.acquire(timeout)
+        start = time.monotonic()
+        ok = False
+        usage = {"units": 1.0}
+        try:
+            yield usage
+            ok = True
+        finally:
+            self.release(time.monotonic() - start, ok, float(usage.get("units") or 1.0))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "type": "adaptive_concurrency",
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "best_latency_per_unit_s": round(self.best_latency, 4) if self.best_latency else None,
+                "last_latency_per_unit_s": round(self.last_latency, 4) if self.last_latency else None,
+                **self.metrics.as_dict(),
+            }
+
+
+# ---------------------- Limiter Registry ----------------------
+
+_LIMITERS: Dict[str, Any] = {}
+_LOCK = threading.Lock()
+
+
+def _build_limiter(name: str):
+    config = get_config()
+    if name == "tavily":
+        return TokenBucket(name, rate=config.get("TAVILY_RATE_PER_SEC", 1.0), capacity=config.get("TAVILY_BURST", 3))
+    prefix = "OLLAMA_EMBED" if name.startswith("ollama_embed") else "OLLAMA"
+    return AdaptiveConcurrencyLimiter(
+        name,
+        initial=config.get(f"{prefix}_INITIAL_CONCURRENCY", 2),
+        min_limit=config.get(f"{prefix}_MIN_CONCURRENCY", 1),
+        max_limit=config.get(f"{prefix}_MAX_CONCURRENCY", 4),
+        latency_tolerance=config.get("OLLAMA_LATENCY_TOLERANCE", 2.0),
+    )
+
+
+def get_limiter(name: str):
+    """Process-wide limiter for 'ollama_chat:<model>', 'ollama_embed' or 'tavily'"""
+    with _LOCK:
+        limiter = _LIMITERS.get(name)
+        if limiter is None:
+            limiter = _build_limiter(name)
+            _LIMITERS[name] = limiter
+        return limiter
+
+
+@contextmanager
+def limited(name: str):
+    """Hold a slot on the named limiter for the duration of the block (no-op when disabled).
+    Calls from a stage whose deadline has passed are rejected instead of queued, and
+    nobody waits in the queue past their deadline. Yields a dict where the caller may
+    set "units" (tokens generated, texts embedded) for latency normalisation."""
+    config = get_config()
+    deadline = current_deadline()
+    if deadline is not None:
+        deadline.check(name)
+    if not config.get("ENABLE_RATE_LIMITING", True):
+        yield {}
+        return
+    timeout = config.get("LIMITER_QUEUE_TIMEOUT")
+    if deadline is not None:
+        timeout = deadline.budget(timeout)
+    acquired = False
+    try:
+        with get_limiter(name).slot(timeout=timeout) as usage:
+            acquired = True
+            if deadline is not None:
+                deadline.check(name)
+            yield usage
+    except LimiterTimeout:
+        if not acquired and deadline is not None and deadline.expired():
+            raise DeadlineExceeded(f"{name} cancelled: deadline passed while queued") from None
+        raise
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    with _LOCK:
+        limiters = dict(_LIMITERS)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
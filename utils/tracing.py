@@ -0,0 +1,155 @@
+"""
+Request tracing and optional CPU profiling (ENABLE_PROFILING / PROFILE_CPU).
+
+Each pipeline request records one trace: a span per stage and per LLM, search,
+embedding and store call, with payload sizes and token counts as span args.
+Traces are written to PROFILE_DIR as Chrome trace-event JSON, which opens directly
+in https://ui.perfetto.dev or chrome://tracing. With PROFILE_CPU on, every stage is
+also run under cProfile and dumped next to the trace as ``.prof`` (snakeviz, flameprof).
+
+When profiling is off, span() and profiled() are no-ops.
+"""
+
+import contextvars
+import cProfile
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from config import get_config
+
+_CURRENT_TRACE: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("current_trace", default=None)
+
+
+class Trace:
+    def __init__(self, name: str, **args: Any):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.name = name
+        self.args = args
+        self.origin = time.perf_counter()
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add_event(self, name: str, cat: str, start: float, end: float, args: Dict[str, Any]):
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round((start - self.origin) * 1e6, 1),
+            "dur": round((end - start) * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def write(self, directory: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", str(self.args.get("topic", self.name)))[:40].strip("-") or self.name
+        path = os.path.join(directory, f"trace-{self.id}-{slug}.json")
+        with self._lock:
+            thread_names = {t.ident: t.name for t in threading.enumerate()}
+            metadata_events = [
+                {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                 "args": {"name": thread_names.get(tid, str(tid))}}
+                for tid in {e["tid"] for e in self.events}
+            ]
+            payload = {"traceEvents": metadata_events + self.events, "displayTimeUnit": "ms",
+                       "metadata": {"trace_id": self.id, "name": self.name, **self.args}}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, default=str)
+        return path
+
+
+# ---------------------- Trace Lifecycle ----------------------
+
+def profiling_enabled() -> bool:
+    return bool(get_config().get("ENABLE_PROFILING", False))
+
+
+def current_trace() -> Optional[Trace]:
+    return _CURRENT_TRACE.get()
+
+
+@contextmanager
+def start_trace(name: str, **args: Any):
+    """Open a trace for one request; yields the Trace (or None when profiling is off / already tracing)"""
+    if not profiling_enabled() or current_trace() is not None:
+        yield None
+        return
+    trace = Trace(name, **args)
+    token = _CURRENT_TRACE.set(trace)
+    start = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        trace.add_event(name, "request", start, time.perf_counter(), dict(args))
+        _CURRENT_TRACE.reset(token)
+        try:
+            path = trace.write(get_config().get("PROFILE_DIR", "./data/profiles"))
+            print(f"🧪 Trace written to {path}")
+        except Exception as e:
+            print(f"⚠️ Could not write trace: {e}")
+
+
+@contextmanager
+def span(name: str, cat: str = "stage", **args: Any):
+    """Record a span on the current trace. Yields a dict; keys added to it during the
+    block (payload sizes, token counts) are stored as span args."""
+    trace = current_trace()
+    attrs: Dict[str, Any] = dict(args)
+    if trace is None:
+        yield attrs
+        return
+    start = time.perf_counter()
+    try:
+        yield attrs
+    except Exception as e:
+        attrs["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        trace.add_event(name, cat, start, time.perf_counter(), attrs)
+
+
+@contextmanager
+def profiled(name: str):
+    """Run the block under cProfile when PROFILE_CPU is on and a trace is active"""
+    trace = current_trace()
+    if trace is None or not get_config().get("PROFILE_CPU", False):
+        yield
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # another profiler already owns this thread (nested profiled() block)
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        directory = get_config().get("PROFILE_DIR", "./data/profiles")
+        os.makedirs(directory, exist_ok=True)
+        profiler.dump_stats(os.path.join(directory, f"trace-{trace.id}-{name}.prof"))
+
+
+def token_usage(result: Any) -> Dict[str, Any]:
+    """Pull token counts out of a LangChain ChatResult (usage_metadata or Ollama generation_info)"""
+    try:
+        generation = result.generations[0]
+    except (AttributeError, IndexError):
+        return {}
+    usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+    info = getattr(generation, "generation_info", None) or {}
+    return {
+        "input_tokens": usage.get("input_tokens", info.get("prompt_eval_count")),
+        "output_tokens": usage.get("output_tokens", info.get("eval_count")),
+        "output_chars": len(getattr(generation, "text", "") or ""),
+    }
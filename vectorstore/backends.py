@@ -0,0 +1,265 @@
+"""
+Single entry point for vector stores.
+
+All stores are selected by ``VECTOR_BACKEND`` and live under ``VECTOR_DIR``:
+
+    <VECTOR_DIR>/chroma.sqlite3          Chroma (chat_sessions + startup_vectors)
+    <VECTOR_DIR>/ann/<collection>/       persistent HNSW index (faiss / hnswlib)
+    <VECTOR_DIR>/numpy/<collection>/     brute-force NumPy store for small corpora
+    <VECTOR_DIR>/embedding_cache/<model>/ content-hash embedding cache
+"""
+
+import os
+import threading
+from typing import Callable, Dict, List, Tuple
+
+from config import get_config
+from utils.circuit_breaker import guarded
+from utils.rate_limit import limited
+from utils.tracing import span
+
+
+_STORES: Dict[Tuple[str, str, str], object] = {}
+_CHROMA_CLIENTS: Dict[str, object] = {}
+_EMBEDDINGS: Dict[str, object] = {}
+_LOCK = threading.RLock()
+
+
+# ---------------------- Shared Paths and Clients ----------------------
+
+LEGACY_VECTOR_DIR = "./chroma_db"
+LEGACY_COLLECTIONS = ("chat_sessions", "startup_vectors")
+_RESOLVED_DIRS: Dict[str, str] = {}
+
+
+def _chroma_collection_names(db_path: str) -> set:
+    """Collection names in a Chroma directory, read from its sqlite file without importing chromadb"""
+    import sqlite3
+
+    path = os.path.join(db_path, "chroma.sqlite3")
+    if not os.path.exists(path):
+        return set()
+    try:
+        conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+        try:
+            return {row[0] for row in conn.execute("SELECT name FROM collections")}
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return set()
+
+
+def get_persist_directory() -> str:
+    """Root directory shared by every backend"""
+    db_path = get_config().get("VECTOR_DIR", "./data/chroma_db")
+    resolved = _RESOLVED_DIRS.get(db_path)
+    if resolved is None:
+        resolved = db_path
+        # the default used to be ./chroma_db: keep using it while it holds the app's data and the
+        # new default has no chat history yet (VECTOR_DIR set explicitly always wins)
+        if (not os.getenv("VECTOR_DIR")
+                and _chroma_collection_names(LEGACY_VECTOR_DIR) & set(LEGACY_COLLECTIONS)
+                and "chat_sessions" not in _chroma_collection_names(db_path)):
+            print(f"⚠️ Using legacy vector dir {LEGACY_VECTOR_DIR}; move it to {db_path} or set VECTOR_DIR")
+            resolved = LEGACY_VECTOR_DIR
+        os.makedirs(resolved, exist_ok=True)
+        _RESOLVED_DIRS[db_path] = resolved
+    return resolved
+
+
+def get_chroma_client(persist_directory: str | None = None):
+    """One chromadb PersistentClient per directory, shared by sessions and vectors"""
+    import chromadb
+
+    db_path = persist_directory or get_persist_directory()
+    with _LOCK:
+        client = _CHROMA_CLIENTS.get(db_path)
+        if client is None:
+            os.makedirs(db_path, exist_ok=True)
+            client = chromadb.PersistentClient(path=db_path)
+            _CHROMA_CLIENTS[db_path] = client
+        return client
+
+
+def get_embeddings():
+    """Embedding model used by every backend, fronted by the shared embedding cache"""
+    config = get_config()
+    model_name = config.get("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+    key = f"{model_name}@{get_persist_directory()}" if config.get("EMBED_CACHE_ENABLED", True) else model_name
+    with _LOCK:
+        embeddings = _EMBEDDINGS.get(key)
+        if embeddings is None:
+            from langchain_ollama import OllamaEmbeddings
+            from agents.llm_clients import deadline_client_kwargs
+
+            embeddings = LimitedEmbeddings(OllamaEmbeddings(model=model_name, client_kwargs=deadline_client_kwargs()))
+            if config.get("EMBED_CACHE_ENABLED", True):
+                from vectorstore.embedding_cache import CachedEmbeddings, EmbeddingCache, cache_directory
+
+                cache = EmbeddingCache(
+                    cache_directory(get_persist_directory(), model_name),
+                    max_memory_items=config.get("EMBED_CACHE_MEMORY_ITEMS", 2048),
+                )
+                embeddings = CachedEmbeddings(embeddings, model_name, cache)
+            _EMBEDDINGS[key] = embeddings
+        return embeddings
+
+
+class LimitedEmbeddings:
+    """Route embedding calls through the 'ollama_embed' breaker and concurrency limiter"""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    def embed_documents(self, texts):
+        with span("embed.ollama", "embed", texts=len(texts), chars=sum(len(t) for t in texts)), \
+                guarded("ollama_embed"), limited("ollama_embed") as usage:
+            usage["units"] = len(texts)
+            return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text):
+        with span("embed.ollama", "embed", texts=1, chars=len(text)), guarded("ollama_embed"), limited("ollama_embed"):
+            return self.embeddings.embed_query(text)
+
+
+# ---------------------- Backend Factories ----------------------
+
+def _chroma_backend(embeddings, persist_directory: str, collection_name: str):
+    from langchain_chroma import Chroma
+
+    return Chroma(
+        client=get_chroma_client(persist_directory),
+        collection_name=collection_name,
+        embedding_function=embeddings,
+    )
+
+
+def _ann_backend(embeddings, persist_directory: str, collection_name: str):
+    from vectorstore.local_store import AnnVectorStore
+
+    return AnnVectorStore(
+        embedding=embeddings,
+        persist_directory=os.path.join(persist_directory, "ann", collection_name),
+        collection_name=collection_name,
+        ann_library=get_config().get("ANN_LIBRARY", "auto"),
+    )
+
+
+def _numpy_backend(embeddings, persist_directory: str, collection_name: str):
+    from vectorstore.local_store import NumpyVectorStore
+
+    return NumpyVectorStore(
+        embedding=embeddings,
+        persist_directory=os.path.join(persist_directory, "numpy", collection_name),
+        collection_name=collection_name,
+    )
+
+
+VECTOR_BACKENDS: Dict[str, Callable] = {
+    "chroma": _chroma_backend,
+    "ann": _ann_backend,
+    "numpy": _numpy_backend,
+}
+
+
+# ---------------------- Vector Store Factory Function ----------------------
+
+def get_vectorstore(collection_name: str | None = None, backend: str | None = None,
+                    persist_directory: str | None = None):
+    """Return the configured vector store, reusing one instance per collection"""
+    config = get_config()
+    backend = (backend or config.get("VECTOR_BACKEND", "chroma")).lower()
+    collection_name = collection_name or config.get("VECTOR_COLLECTION", "startup_vectors")
+    persist_directory = persist_directory or get_persist_directory()
+
+    factory = VECTOR_BACKENDS.get(backend)
+    if factory is None:
+        raise ValueError(f"Unknown VECTOR_BACKEND '{backend}'. Choose one of: {', '.join(VECTOR_BACKENDS)}")
+
+    key = (backend, os.path.abspath(persist_directory), collection_name)
+    store = _STORES.get(key)
+    if store is None:
+        with _LOCK:
+            store = _STORES.get(key)
+            if store is None:
+                store = factory(get_embeddings(), persist_directory, collection_name)
+                _STORES[key] = store
+    return store
+
+
+# ---------------------- Bulk Similarity Search ----------------------
+
+def _chroma_query_by_vectors(collection_name: str, query_vectors, k: int):
+    """Raw batched query on a Chroma collection: one (id, document, metadata, distance) list per query"""
+    collection = get_chroma_client().get_or_create_collection(name=collection_name)
+    res = collection.query(
+        query_embeddings=query_vectors,
+        n_results=k,
+        include=["documents", "metadatas", "distances"],
+    )
+    return [list(zip(ids, docs, metas, dists))
+            for ids, docs, metas, dists in zip(res["ids"], res["documents"], res["metadatas"], res["distances"])]
+
+
+def bulk_similarity_search(queries: List[str], k: int = 3, collection_name: str | None = None):
+    """Embed all queries in one call and run a batched top-k against the store.
+    Returns one list of (Document, relevance score in [0, 1]) per query."""
+    if not queries:
+        return []
+    collection_name = collection_name or get_config().get("VECTOR_COLLECTION", "startup_vectors")
+    vs = get_vectorstore(collection_name=collection_name)
+    query_vectors = vs.embeddings.embed_documents(list(queries))
+    relevance = vs._select_relevance_score_fn()
+
+    if hasattr(vs, "similarity_search_with_score_by_vectors"):
+        batches = vs.similarity_search_with_score_by_vectors(query_vectors, k=k)
+        return [[(doc, relevance(score)) for doc, score in batch] for batch in batches]
+
+    from langchain_core.documents import Document
+
+    return [
+        [(Document(page_content=doc or "", metadata=meta or {}, id=sid), relevance(dist))
+         for sid, doc, meta, dist in rows]
+        for rows in _chroma_query_by_vectors(collection_name, query_vectors, k)
+    ]
+
+
+# ---------------------- Filtered / Diverse Retrieval ----------------------
+
+def _where(filter: Dict | None) -> Dict | None:
+    """Plain {key: value, ...} filters become a Chroma-compatible $and clause"""
+    if not filter:
+        return None
+    plain = [{k: v} for k, v in filter.items() if not k.startswith("$")]
+    if len(plain) <= 1 or len(plain) != len(filter):
+        return filter
+    return {"$and": plain}
+
+
+def retrieve(query: str, k: int = 5, filter: Dict | None = None, score_threshold: float | None = None,
+             use_mmr: bool = False, fetch_k: int = 20, lambda_mult: float = 0.5,
+             collection_name: str | None = None):
+    """Similarity or MMR retrieval with metadata prefiltering inside the index.
+    score_threshold is a relevance score in [0, 1]."""
+    from vectorstore.local_store import NumpyVectorStore
+
+    vs = get_vectorstore(collection_name=collection_name)
+    where = _where(filter)
+
+    if not use_mmr:
+        if score_threshold is None:
+            return vs.similarity_search(query, k=k, filter=where)
+        scored = vs.similarity_search_with_relevance_scores(query, k=k, filter=where, score_threshold=score_threshold)
+        return [doc for doc, _ in scored]
+
+    if isinstance(vs, NumpyVectorStore):
+        cosine_threshold = None if score_threshold is None else 2.0 * score_threshold - 1.0
+        return vs.max_marginal_relevance_search(query, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult,
+                                                filter=where, score_threshold=cosine_threshold)
+
+    docs = vs.max_marginal_relevance_search(query, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult, filter=where)
+    if score_threshold is None:
+        return docs
+    passing = vs.similarity_search_with_relevance_scores(query, k=fetch_k, filter=where, score_threshold=score_threshold)
+    allowed = {doc.id or doc.page_content for doc, _ in passing}
+    return [doc for doc in docs if (doc.id or doc.page_content) in allowed]
@@ -1,31 +1,53 @@
 import json
-import os
 import time
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
-import chromadb
-
-from config import get_config
+from utils.circuit_breaker import circuit_protected
+from vectorstore.backends import get_chroma_client
 
 
 # ---------------------- ChromaDB Client Initialization ----------------------
 
-def _get_client() -> chromadb.PersistentClient:
-    config = get_config()
-    db_path = config.get("VECTOR_DIR", "./chroma_db")
-    os.makedirs(db_path, exist_ok=True)
-    return chromadb.PersistentClient(path=db_path)
+def _get_client():
+    """Shared client on VECTOR_DIR, the same database the vector store writes to"""
+    return get_chroma_client()
+
+
+# ---------------------- Change Notifications ----------------------
+
+_SESSION_LISTENERS: List[Callable[[], None]] = []
+
+
+def on_sessions_changed(callback: Callable[[], None]):
+    """Register a callback (e.g. a UI cache invalidation) run after sessions are created or updated"""
+    if callback not in _SESSION_LISTENERS:
+        _SESSION_LISTENERS.append(callback)
+
+
+def _notify_sessions_changed():
+    for callback in list(_SESSION_LISTENERS):
+        try:
+            callback()
+        except Exception as e:
+            print(f"⚠️ Session change listener failed: {e}")
 
 
 # ---------------------- Collection Management ----------------------
 
+_COLLECTIONS: Dict[int, Any] = {}
+
+
 def _get_collection():
     client = _get_client()
-    return client.get_or_create_collection(
-        name="chat_sessions",
-        metadata={"kind": "chat_store"},
-    )
+    col = _COLLECTIONS.get(id(client))
+    if col is None:
+        col = client.get_or_create_collection(
+            name="chat_sessions",
+            metadata={"kind": "chat_store"},
+        )
+        _COLLECTIONS[id(client)] = col
+    return col
 
 
 # ---------------------- Session Serialization ----------------------
@@ -61,6 +83,7 @@ def _deserialize_session(doc: str) -> Dict[str, Any]:
 
 # ---------------------- Session Listing ----------------------
 
+@circuit_protected("chroma")
 def list_sessions() -> List[Dict[str, Any]]:
     col = _get_collection()
     results = col.get(include=["metadatas"], limit=1000)
@@ -82,7 +105,13 @@ def list_sessions() -> List[Dict[str, Any]]:
 
 # ---------------------- Session Retrieval ----------------------
 
+@circuit_protected("chroma")
 def get_session(session_id: str) -> Optional[Dict[str, Any]]:
+    return _get_session(session_id)
+
+
+def _get_session(session_id: str) -> Optional[Dict[str, Any]]:
+    """Unguarded read for callers already inside the 'chroma' breaker"""
     col = _get_collection()
     res = col.get(ids=[session_id], include=["documents", "metadatas"])
     ids = res.get("ids", []) or []
@@ -96,6 +125,7 @@ def get_session(session_id: str) -> Optional[Dict[str, Any]]:
 
 # ---------------------- Session Creation ----------------------
 
+@circuit_protected("chroma")
 def create_session(title: str, user_prompt: str, result: Dict[str, Any]) -> str:
     col = _get_collection()
     session_id = str(uuid.uuid4())
@@ -113,13 +143,15 @@ def create_session(title: str, user_prompt: str, result: Dict[str, Any]) -> str:
         documents=[doc],
         metadatas=[{"title": title, "created_at": ts, "updated_at": ts}],
     )
+    _notify_sessions_changed()
     return session_id
 
 
 # ---------------------- Session Update ----------------------
 
+@circuit_protected("chroma")
 def update_session(session_id: str, user_prompt: Optional[str], result: Optional[Dict[str, Any]]):
-    existing = get_session(session_id)
+    existing = _get_session(session_id)
     if not existing:
         return
     messages: List[Dict[str, Any]] = existing.get("messages", [])
@@ -135,5 +167,6 @@ def update_session(session_id: str, user_prompt: Optional[str], result: Optional
         documents=[doc],
         metadatas=[{"title": existing.get("title", "Untitled"), "created_at": existing.get("created_at", ts), "updated_at": ts}],
     )
+    _notify_sessions_changed()
 
 
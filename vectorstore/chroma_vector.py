@@ -1,23 +1,11 @@
-from langchain_chroma import Chroma
-from langchain_ollama import OllamaEmbeddings
-import os
+from vectorstore.backends import get_vectorstore as _get_configured_vectorstore, retrieve
 
 # ---------------------- ChromaDB Vector Store Functions ----------------------
 
 def get_vectorstore():
-    """Initialize ChromaDB vector store with Ollama embeddings"""
-    embeddings = OllamaEmbeddings(model="nomic-embed-text")
-    
-    persist_directory = "./chroma_db"
-    
-    return Chroma(
-        collection_name="startup_vectors",
-        embedding_function=embeddings,
-        persist_directory=persist_directory
-    )
+    """Return the configured vector store (Chroma by default, see VECTOR_BACKEND)"""
+    return _get_configured_vectorstore()
 
-def search_vectorstore(query, k=5):
-    """Search the vector store for relevant documents"""
-    vs = get_vectorstore()
-    docs = vs.similarity_search(query, k=k)
-    return docs
\ No newline at end of file
+def search_vectorstore(query, k=5, **kwargs):
+    """Search the vector store for relevant documents (see vectorstore.backends.retrieve for options)"""
+    return retrieve(query, k=k, **kwargs)
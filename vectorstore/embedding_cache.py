@@ -0,0 +1,197 @@
+"""
+Content-addressed embedding cache shared by every embedding call.
+
+Key: sha256(model name + text). Vectors sit in an LRU dict in memory and in a
+compact append-only float32 file on disk that is read through ``np.memmap``:
+
+    <VECTOR_DIR>/embedding_cache/<model>/vectors.f32   raw float32 rows
+    <VECTOR_DIR>/embedding_cache/<model>/keys.txt      one hex key per row
+    <VECTOR_DIR>/embedding_cache/<model>/meta.json     {"dim": ...}
+
+Appends take an exclusive lock on ``append.lock`` and row numbers come from what is on
+disk, so several processes (Streamlit, api_server.py, CLIs) can share one VECTOR_DIR.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from utils.file_lock import file_lock
+from utils.tracing import span
+
+
+# ---------------------- Disk + Memory Cache ----------------------
+
+class EmbeddingCache:
+    def __init__(self, directory: str, max_memory_items: int = 2048):
+        self.directory = directory
+        self.max_memory_items = max_memory_items
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._rows: Dict[str, int] = {}
+        self._dim: Optional[int] = None
+        self._mmap = None
+        self._keys_offset = 0
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, file_lock(self._path("append.lock")):
+            self._sync()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _sync(self):
+        """Pick up rows appended by other processes and repair a torn append.
+        Caller holds both the thread lock and the file lock."""
+        if self._dim is None:
+            if not os.path.exists(self._path("meta.json")):
+                return
+            with open(self._path("meta.json"), encoding="utf-8") as f:
+                self._dim = json.load(f)["dim"]
+        keys_path, vectors_path = self._path("keys.txt"), self._path("vectors.f32")
+        new_keys: List[str] = []
+        if os.path.exists(keys_path):
+            with open(keys_path, "rb") as f:
+                f.seek(self._keys_offset)
+                data = f.read()
+            complete = data[:data.rfind(b"\n") + 1]
+            new_keys = complete.decode("utf-8").split()
+            self._keys_offset += len(complete)
+        keys = list(self._rows) + new_keys
+        row_bytes = 4 * self._dim
+        stored_rows = os.path.getsize(vectors_path) // row_bytes if os.path.exists(vectors_path) else 0
+        rows = min(len(keys), stored_rows)
+
+        # a crash between (or during) the two appends leaves extra bytes or keys: cut both back
+        if os.path.exists(vectors_path) and os.path.getsize(vectors_path) != rows * row_bytes:
+            with open(vectors_path, "r+b") as f:
+                f.truncate(rows * row_bytes)
+            self._mmap = None
+        if len(keys) != rows or (os.path.exists(keys_path) and os.path.getsize(keys_path) != self._keys_offset):
+            content = "".join(f"{key}\n" for key in keys[:rows]).encode("utf-8")
+            with open(keys_path, "wb") as f:
+                f.write(content)
+            self._keys_offset = len(content)
+        self._rows = {key: row for row, key in enumerate(keys[:rows])}
+
+    def _keys_grew(self) -> bool:
+        try:
+            return os.path.getsize(self._path("keys.txt")) > self._keys_offset
+        except FileNotFoundError:
+            return False
+
+    def _read_row(self, row: int) -> np.ndarray:
+        if self._mmap is None or row >= self._mmap.shape[0]:
+            self._mmap = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r",
+                                   shape=(len(self._rows), self._dim))
+        return np.array(self._mmap[row])
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vector
+            row = self._rows.get(key)
+            if row is None and self._keys_grew():
+                # another process appended since we last looked
+                with file_lock(self._path("append.lock")):
+                    self._sync()
+                row = self._rows.get(key)
+            if row is None:
+                self.misses += 1
+                return None
+            vector = self._read_row(row)
+            self._remember(key, vector)
+            self.hits += 1
+            return vector
+
+    def put_many(self, keys: List[str], vectors: List[List[float]]):
+        if not keys:
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            with file_lock(self._path("append.lock")):
+                self._sync()
+                if self._dim is None:
+                    self._dim = int(matrix.shape[1])
+                    with open(self._path("meta.json"), "w", encoding="utf-8") as f:
+                        json.dump({"dim": self._dim}, f)
+                if matrix.shape[1] != self._dim:
+                    return
+                new: Dict[str, int] = {}
+                for i, key in enumerate(keys):
+                    if key not in self._rows:
+                        new.setdefault(key, i)
+                if new:
+                    with open(self._path("vectors.f32"), "ab") as f:
+                        f.write(matrix[list(new.values())].tobytes())
+                    content = "".join(f"{key}\n" for key in new).encode("utf-8")
+                    with open(self._path("keys.txt"), "ab") as f:
+                        f.write(content)
+                    self._keys_offset += len(content)
+                    for key in new:
+                        self._rows[key] = len(self._rows)
+            for key, vector in zip(keys, matrix):
+                self._remember(key, vector)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "stored": len(self._rows), "in_memory": len(self._memory)}
+
+
+# ---------------------- Embeddings Wrapper ----------------------
+
+class CachedEmbeddings(Embeddings):
+    """Wrap any LangChain embeddings and only send cache misses to the model"""
+
+    def __init__(self, embeddings: Embeddings, model_name: str, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with span("embed.cache", "embed", texts=len(texts)) as attrs:
+            return self._embed_documents(texts, attrs)
+
+    def _embed_documents(self, texts: List[str], attrs: Dict) -> List[List[float]]:
+        keys = [self._key(t) for t in texts]
+        vectors: List[Optional[np.ndarray]] = [self.cache.get(k) for k in keys]
+
+        missing: Dict[str, str] = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None:
+                missing.setdefault(key, text)
+        attrs["misses"] = len(missing)
+        if missing:
+            computed = self.embeddings.embed_documents(list(missing.values()))
+            self.cache.put_many(list(missing.keys()), computed)
+            fresh = dict(zip(missing.keys(), computed))
+            vectors = [v if v is not None else np.asarray(fresh[k], dtype=np.float32) for k, v in zip(keys, vectors)]
+        return [v.tolist() for v in vectors]
+
+    def embed_query(self, text: str) -> List[float]:
+        # Ollama embeds queries and documents the same way, so both share one key space
+        return self.embed_documents([text])[0]
+
+
+def cache_directory(root: str, model_name: str) -> str:
+    safe_model = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+    return os.path.join(root, "embedding_cache", safe_model)
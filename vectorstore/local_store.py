@@ -0,0 +1,598 @@
+"""
+In-process vector stores that share the VECTOR_DIR layout with Chroma:
+
+- NumpyVectorStore: exact brute-force cosine search, best for small corpora.
+- AnnVectorStore: persistent HNSW index (faiss or hnswlib) over the same files.
+
+Each collection lives in ``<VECTOR_DIR>/<backend>/<collection>/`` as
+``vectors.npz`` (ids + normalized float32 rows) and ``records.jsonl`` (id, text, metadata).
+Rows are joined to records by id, so a crash between the two writes can lose a row but
+never pair a text with another text's vector.
+
+Several processes may share a collection: every write holds ``store.lock`` and first
+reloads whatever another process wrote, and reads reload when the files have changed.
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from utils.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------- Vector Helpers ----------------------
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Row-wise top-k over a (queries, rows) score matrix, best first"""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(np.float32)
+    idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part = np.take_along_axis(scores, idx, axis=1)
+    order = np.argsort(-part, axis=1)
+    idx = np.take_along_axis(idx, order, axis=1)
+    return idx, np.take_along_axis(scores, idx, axis=1)
+
+
+def _compare(column: np.ndarray, op: str, value) -> np.ndarray:
+    if op == "$eq":
+        return column == value
+    if op == "$ne":
+        return column != value
+    if op in ("$in", "$nin"):
+        values = set(value)
+        mask = np.fromiter((v in values for v in column), dtype=bool, count=len(column))
+        return mask if op == "$in" else ~mask
+    compare = {"$gt": lambda v: v > value, "$gte": lambda v: v >= value,
+               "$lt": lambda v: v < value, "$lte": lambda v: v <= value}.get(op)
+    if compare is None:
+        raise ValueError(f"Unsupported filter operator '{op}'")
+    return np.fromiter((v is not None and compare(v) for v in column), dtype=bool, count=len(column))
+
+
+def _mmr(query_scores: np.ndarray, candidates: np.ndarray, k: int, lambda_mult: float) -> List[int]:
+    """Greedy maximal marginal relevance over normalized candidate vectors"""
+    pairwise = candidates @ candidates.T
+    selected: List[int] = []
+    max_sim = np.full(len(candidates), -np.inf, dtype=np.float32)
+    for _ in range(min(k, len(candidates))):
+        redundancy = np.where(np.isfinite(max_sim), max_sim, 0.0)
+        mmr = lambda_mult * query_scores - (1.0 - lambda_mult) * redundancy
+        mmr[selected] = -np.inf
+        best = int(np.argmax(mmr))
+        selected.append(best)
+        max_sim = np.maximum(max_sim, pairwise[best])
+    return selected
+
+
+# ---------------------- Brute-force NumPy Store ----------------------
+
+class NumpyVectorStore(VectorStore):
+    """Exact cosine-similarity store kept fully in memory and persisted to disk.
+    Scores returned by the ``*_with_score`` methods are cosine similarities (higher is better)."""
+
+    backend_name = "numpy"
+
+    def __init__(self, embedding: Embeddings, persist_directory: Optional[str] = None,
+                 collection_name: str = "startup_vectors"):
+        self._embedding = embedding
+        self.collection_name = collection_name
+        self.persist_directory = persist_directory
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[dict] = []
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._columns: dict = {}
+        self._bulk: Optional[dict] = None
+        self._signature = None
+        if persist_directory:
+            os.makedirs(persist_directory, exist_ok=True)
+            self._refresh()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return int(self._vectors.shape[1]) if len(self._ids) else None
+
+    # ---------------------- Persistence ----------------------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.persist_directory, name)
+
+    def _disk_signature(self) -> tuple:
+        signature = []
+        for name in ("vectors.npz", "records.jsonl"):
+            try:
+                st = os.stat(self._path(name))
+                signature.append((st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _load(self):
+        """Replace the in-memory state with what is on disk (caller holds the file lock)"""
+        self._signature = self._disk_signature()
+        records = {}
+        if os.path.exists(self._path("records.jsonl")):
+            with open(self._path("records.jsonl"), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    records[record["id"]] = record
+        if os.path.exists(self._path("vectors.npz")):
+            with np.load(self._path("vectors.npz")) as data:
+                ids, vectors = [str(i) for i in data["ids"]], data["vectors"]
+        elif os.path.exists(self._path("vectors.npy")):
+            # older layout without ids next to the vectors: rows follow record order
+            vectors = np.load(self._path("vectors.npy"))
+            ids = list(records)[:len(vectors)]
+        else:
+            ids, vectors = [], np.zeros((0, 0), dtype=np.float32)
+        rows = [i for i, sid in enumerate(ids) if sid in records]
+        if len(rows) != len(ids) or len(rows) != len(records):
+            logger.warning(f"{self.collection_name}: {len(ids)} vectors / {len(records)} records on disk, "
+                           f"keeping the {len(rows)} present in both")
+        self._ids = [ids[i] for i in rows]
+        self._texts = [records[sid].get("text", "") for sid in self._ids]
+        self._metadatas = [records[sid].get("metadata") or {} for sid in self._ids]
+        self._vectors = (np.ascontiguousarray(vectors[rows], dtype=np.float32) if rows
+                         else np.zeros((0, 0), dtype=np.float32))
+        self._columns.clear()
+
+    def _write_vectors(self):
+        tmp_path = self._path("vectors.tmp.npz")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, ids=np.array(self._ids, dtype=str), vectors=self._vectors)
+        os.replace(tmp_path, self._path("vectors.npz"))
+        if os.path.exists(self._path("vectors.npy")):
+            os.remove(self._path("vectors.npy"))
+
+    def _save(self, appended: int):
+        """Rewrite the vector matrix and append the new records"""
+        if not self.persist_directory:
+            return
+        self._write_vectors()
+        start = len(self._ids) - appended
+        with open(self._path("records.jsonl"), "a", encoding="utf-8") as f:
+            for i in range(start, len(self._ids)):
+                f.write(json.dumps({"id": self._ids[i], "text": self._texts[i], "metadata": self._metadatas[i]},
+                                   ensure_ascii=False) + "\n")
+        self._signature = self._disk_signature()
+
+    def _rewrite(self):
+        """Persist the full collection after deletions"""
+        if not self.persist_directory:
+            return
+        self._write_vectors()
+        tmp_path = self._path("records.tmp.jsonl")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for sid, text, meta in zip(self._ids, self._texts, self._metadatas):
+                f.write(json.dumps({"id": sid, "text": text, "metadata": meta}, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self._path("records.jsonl"))
+        self._signature = self._disk_signature()
+
+    @contextmanager
+    def _writing(self):
+        """Thread lock + inter-process file lock for a write, after reloading other processes' changes"""
+        with self._lock:
+            if not self.persist_directory or self._bulk is not None:
+                # bulk_load() already holds the file lock for the whole block
+                yield
+                return
+            with file_lock(self._path("store.lock")):
+                if self._disk_signature() != self._signature:
+                    self._load()
+                    self._on_reloaded()
+                yield
+
+    def _refresh(self):
+        """Pick up writes made by other processes (a stat() call when nothing changed)"""
+        if self.persist_directory and self._bulk is None and self._disk_signature() != self._signature:
+            with self._writing():
+                pass
+
+    # ---------------------- Writes ----------------------
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        embeddings = self._embedding.embed_documents(texts)
+        return self.add_embeddings(texts, embeddings, metadatas=metadatas, ids=ids)
+
+    def add_embeddings(self, texts: List[str], embeddings, metadatas: Optional[List[dict]] = None,
+                       ids: Optional[List[str]] = None) -> List[str]:
+        """Add precomputed embeddings without calling the embedding model"""
+        vectors = _normalize(embeddings)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        with self._writing():
+            if len(self._ids) and vectors.shape[1] != self._vectors.shape[1]:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match collection dimension {self._vectors.shape[1]}")
+            existing = set(ids) & set(self._ids)
+            if existing:
+                self._delete_locked(existing)
+            self._vectors = vectors if not len(self._ids) else np.vstack([self._vectors, vectors])
+            self._ids.extend(ids)
+            self._texts.extend(texts)
+            self._metadatas.extend(dict(m or {}) for m in metadatas)
+            self._columns.clear()
+            if self._bulk is not None:
+                self._bulk["rewrite"] = self._bulk["rewrite"] or bool(existing)
+            elif existing:
+                self._rewrite()
+                self._on_added(vectors, len(self._ids) - len(ids))
+            else:
+                self._save(appended=len(ids))
+                self._on_added(vectors, len(self._ids) - len(ids))
+        return ids
+
+    @contextmanager
+    def bulk_load(self):
+        """Defer persistence and index updates to the end of the block, so loading N batches
+        writes vectors.npz and the ANN index once instead of N times"""
+        with self._writing():
+            self._bulk = {"start": len(self._ids), "rewrite": False}
+            try:
+                yield self
+            finally:
+                bulk, self._bulk = self._bulk, None
+                start = bulk["start"]
+                if bulk["rewrite"]:
+                    self._rewrite()
+                    self._on_rebuilt()
+                elif len(self._ids) > start:
+                    self._save(appended=len(self._ids) - start)
+                    self._on_added(self._vectors[start:], start)
+
+    def iter_batches(self, batch_size: int = 500):
+        """Yield (ids, texts, metadatas, vectors) slices, e.g. for export"""
+        start = 0
+        self._refresh()
+        while True:
+            with self._lock:
+                end = min(start + batch_size, len(self._ids))
+                if start >= end:
+                    return
+                batch = (self._ids[start:end], self._texts[start:end],
+                         [dict(m) for m in self._metadatas[start:end]], np.array(self._vectors[start:end]))
+            yield batch
+            start = end
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        with self._writing():
+            removed = self._delete_locked(set(ids))
+            if removed:
+                self._rewrite()
+        return bool(removed)
+
+    def _delete_locked(self, ids: set) -> int:
+        keep = [i for i, sid in enumerate(self._ids) if sid not in ids]
+        removed = len(self._ids) - len(keep)
+        if removed:
+            self._ids = [self._ids[i] for i in keep]
+            self._texts = [self._texts[i] for i in keep]
+            self._metadatas = [self._metadatas[i] for i in keep]
+            self._columns.clear()
+            self._vectors = self._vectors[keep] if keep else np.zeros((0, 0), dtype=np.float32)
+            if self._bulk is None:
+                self._on_rebuilt()
+        return removed
+
+    def _on_added(self, vectors: np.ndarray, start: int):
+        """Hook for index-backed subclasses"""
+
+    def _on_rebuilt(self):
+        """Hook for index-backed subclasses"""
+
+    def _on_reloaded(self):
+        """Hook for index-backed subclasses: state was just reloaded from disk"""
+
+    # ---------------------- Metadata Filters ----------------------
+
+    def _column(self, key: str) -> np.ndarray:
+        column = self._columns.get(key)
+        if column is None:
+            column = np.empty(len(self._metadatas), dtype=object)
+            column[:] = [m.get(key) for m in self._metadatas]
+            self._columns[key] = column
+        return column
+
+    def _filter_mask(self, filter: Optional[dict]) -> Optional[np.ndarray]:
+        """Chroma-style ``where`` filter -> boolean row mask, evaluated column-wise"""
+        if not filter:
+            return None
+        masks = []
+        for key, cond in filter.items():
+            if key == "$and":
+                masks.append(np.logical_and.reduce([self._filter_mask(c) for c in cond]))
+            elif key == "$or":
+                masks.append(np.logical_or.reduce([self._filter_mask(c) for c in cond]))
+            elif isinstance(cond, dict):
+                masks.extend(_compare(self._column(key), op, value) for op, value in cond.items())
+            else:
+                masks.append(_compare(self._column(key), "$eq", cond))
+        return np.logical_and.reduce(masks) if masks else None
+
+    # ---------------------- Search ----------------------
+
+    def _search(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (row indices, cosine scores) for normalized query rows; masked-out rows never rank"""
+        scores = queries @ self._vectors.T
+        if mask is not None:
+            scores[:, ~mask] = -np.inf
+            k = min(k, int(mask.sum()))
+        return _top_k(scores, k)
+
+    def _to_results(self, idx_row, score_row, score_threshold: Optional[float] = None) -> List[Tuple[Document, float]]:
+        results = []
+        for i, score in zip(idx_row, score_row):
+            if i < 0 or not np.isfinite(score):
+                continue
+            if score_threshold is not None and score < score_threshold:
+                continue
+            results.append((Document(page_content=self._texts[i], metadata=dict(self._metadatas[i]), id=self._ids[i]),
+                            float(score)))
+        return results
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4, filter: Optional[dict] = None,
+                                               score_threshold: Optional[float] = None,
+                                               **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vectors([embedding], k=k, filter=filter,
+                                                            score_threshold=score_threshold)[0]
+
+    def similarity_search_with_score_by_vectors(self, embeddings, k: int = 4, filter: Optional[dict] = None,
+                                                score_threshold: Optional[float] = None,
+                                                **kwargs: Any) -> List[List[Tuple[Document, float]]]:
+        """Batched top-k: one matrix product for all query rows"""
+        with self._lock:
+            self._refresh()
+            if not self._ids:
+                return [[] for _ in embeddings]
+            idx, scores = self._search(_normalize(embeddings), k, self._filter_mask(filter))
+            return [self._to_results(i, s, score_threshold) for i, s in zip(idx, scores)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self._embedding.embed_query(query), k=k, **kwargs)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k=k, **kwargs)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, **kwargs)]
+
+    # ---------------------- Maximal Marginal Relevance ----------------------
+
+    def max_marginal_relevance_search_by_vector(self, embedding: List[float], k: int = 4, fetch_k: int = 20,
+                                                lambda_mult: float = 0.5, filter: Optional[dict] = None,
+                                                score_threshold: Optional[float] = None,
+                                                **kwargs: Any) -> List[Document]:
+        with self._lock:
+            self._refresh()
+            if not self._ids:
+                return []
+            query = _normalize(embedding)
+            idx, scores = self._search(query, max(fetch_k, k), self._filter_mask(filter))
+            keep = (idx[0] >= 0) & np.isfinite(scores[0])
+            if score_threshold is not None:
+                keep &= scores[0] >= score_threshold
+            candidates, candidate_scores = idx[0][keep], scores[0][keep]
+            if not len(candidates):
+                return []
+            order = _mmr(candidate_scores, self._vectors[candidates], k, lambda_mult)
+            return [doc for doc, _ in self._to_results(candidates[order], candidate_scores[order])]
+
+    def max_marginal_relevance_search(self, query: str, k: int = 4, fetch_k: int = 20, lambda_mult: float = 0.5,
+                                      **kwargs: Any) -> List[Document]:
+        return self.max_marginal_relevance_search_by_vector(self._embedding.embed_query(query), k=k, fetch_k=fetch_k,
+                                                            lambda_mult=lambda_mult, **kwargs)
+
+    def _select_relevance_score_fn(self):
+        return lambda score: (score + 1.0) / 2.0
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None, **kwargs: Any) -> "NumpyVectorStore":
+        store = cls(embedding=embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
+
+
+# ---------------------- ANN Index Adapters ----------------------
+
+class _FaissIndex:
+    file_name = "index.faiss"
+
+    def __init__(self, dim: int, m: int = 32):
+        import faiss
+        self._faiss = faiss
+        self.index = faiss.IndexHNSWFlat(dim, m, faiss.METRIC_INNER_PRODUCT)
+
+    def add(self, vectors: np.ndarray, start: int):
+        self.index.add(vectors)
+
+    def search(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        if mask is None:
+            scores, idx = self.index.search(queries, k)
+        else:
+            selector = self._faiss.IDSelectorBatch(np.flatnonzero(mask).astype(np.int64))
+            params = self._faiss.SearchParametersHNSW(sel=selector)
+            scores, idx = self.index.search(queries, k, params=params)
+        return idx, scores
+
+    def save(self, path: str):
+        self._faiss.write_index(self.index, path)
+
+    def load(self, path: str, count: int) -> bool:
+        index = self._faiss.read_index(path)
+        if index.ntotal != count:
+            return False
+        self.index = index
+        return True
+
+
+class _HnswIndex:
+    file_name = "index.hnsw"
+
+    def __init__(self, dim: int, m: int = 16):
+        import hnswlib
+        self._hnswlib = hnswlib
+        self.dim = dim
+        self.m = m
+        self.index = hnswlib.Index(space="ip", dim=dim)
+        self.index.init_index(max_elements=1024, ef_construction=200, M=m)
+        self.index.set_ef(64)
+
+    def add(self, vectors: np.ndarray, start: int):
+        needed = start + len(vectors)
+        if needed > self.index.get_max_elements():
+            self.index.resize_index(max(needed, self.index.get_max_elements() * 2))
+        self.index.add_items(vectors, np.arange(start, needed))
+
+    def search(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        k = min(k, self.index.get_current_count())
+        self.index.set_ef(max(64, k))
+        if mask is None:
+            labels, distances = self.index.knn_query(queries, k=k)
+        else:
+            labels, distances = self.index.knn_query(queries, k=k, filter=lambda label: bool(mask[label]))
+        return labels.astype(np.int64), 1.0 - distances
+
+    def save(self, path: str):
+        self.index.save_index(path)
+
+    def load(self, path: str, count: int) -> bool:
+        index = self._hnswlib.Index(space="ip", dim=self.dim)
+        index.load_index(path, max_elements=max(count, 1024))
+        if index.get_current_count() != count:
+            return False
+        index.set_ef(64)
+        self.index = index
+        return True
+
+
+ANN_LIBRARIES = {"faiss": _FaissIndex, "hnswlib": _HnswIndex}
+
+
+def _resolve_ann_library(preferred: str = "auto"):
+    names = [preferred] if preferred in ANN_LIBRARIES else list(ANN_LIBRARIES)
+    for name in names:
+        try:
+            __import__(name)
+            return ANN_LIBRARIES[name]
+        except ImportError:
+            continue
+    return None
+
+
+# ---------------------- Persistent ANN Store ----------------------
+
+class AnnVectorStore(NumpyVectorStore):
+    """HNSW-indexed store on top of the NumPy layout. Falls back to brute force
+    when neither faiss nor hnswlib is installed."""
+
+    backend_name = "ann"
+
+    def __init__(self, embedding: Embeddings, persist_directory: Optional[str] = None,
+                 collection_name: str = "startup_vectors", ann_library: str = "auto"):
+        self._index_cls = _resolve_ann_library(ann_library)
+        self._index = None
+        if self._index_cls is None:
+            logger.warning("No ANN library installed (faiss-cpu or hnswlib); using brute-force search.")
+        super().__init__(embedding, persist_directory=persist_directory, collection_name=collection_name)
+
+    def _index_path(self) -> Optional[str]:
+        if not self.persist_directory or self._index_cls is None:
+            return None
+        return self._path(self._index_cls.file_name)
+
+    def _open_index(self):
+        self._index = self._index_cls(self._vectors.shape[1])
+        path = self._index_path()
+        if path and os.path.exists(path):
+            try:
+                if self._index.load(path, len(self._ids)):
+                    return
+            except Exception:
+                logger.exception(f"{self.collection_name}: failed to load ANN index, rebuilding")
+            self._index = self._index_cls(self._vectors.shape[1])
+        self._index.add(self._vectors, 0)
+        self._save_index()
+
+    def _save_index(self):
+        path = self._index_path()
+        if path and self._index is not None:
+            self._index.save(path)
+
+    def _on_added(self, vectors: np.ndarray, start: int):
+        if self._index_cls is None:
+            return
+        if self._index is None:
+            self._open_index()
+            return
+        self._index.add(vectors, start)
+        self._save_index()
+
+    def _on_reloaded(self):
+        # the writer saved its index under the same file lock; _open_index loads it if it matches
+        self._index = None
+        if self._index_cls is not None and len(self._ids):
+            self._open_index()
+
+    def _on_rebuilt(self):
+        if self._index_cls is None:
+            return
+        self._index = None
+        path = self._index_path()
+        if path and os.path.exists(path):
+            os.remove(path)
+        if len(self._ids):
+            self._open_index()
+
+    def _search(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        if self._index is None:
+            return super()._search(queries, k, mask)
+        if mask is not None:
+            allowed = int(mask.sum())
+            # a very selective filter is cheaper (and exact) as a scan over the allowed rows
+            if allowed <= max(4 * k, len(self._ids) // 20):
+                return super()._search(queries, k, mask)
+            k = min(k, allowed)
+        try:
+            return self._index.search(queries, min(k, len(self._ids)), mask)
+        except RuntimeError:
+            # hnswlib raises when the filtered graph walk cannot collect k neighbours
+            return super()._search(queries, k, mask)